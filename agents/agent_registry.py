@@ -0,0 +1,85 @@
+import importlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+NOT_LOADED = "not_loaded"
+LOADING = "loading"
+READY = "ready"
+ERROR = "error"
+
+class AgentRegistry:
+    """
+    Lazily constructs agents on first use and tracks the state of each component.
+    
+    Components are registered with a "module:Class" path (or a zero-argument
+    callable) so heavy modules such as torch/transformers are only imported
+    when the agent that needs them is first requested.
+    """
+
+    def __init__(self):
+        self._factories = {}
+        self._instances = {}
+        self._status = {}
+        self._locks = {}
+        self._executor = None
+
+    def register(self, name, target):
+        self._factories[name] = target
+        self._locks[name] = threading.Lock()
+        self._status[name] = {'state': NOT_LOADED, 'load_seconds': None, 'error': None}
+
+    def override(self, name, instance):
+        """Install a pre-built instance (e.g. a fake in tests or benchmarks)."""
+        if name not in self._factories:
+            self.register(name, lambda: instance)
+        self._instances[name] = instance
+        self._status[name] = {'state': READY, 'load_seconds': 0.0, 'error': None}
+
+    def get_loaded(self, name):
+        """The instance if it is already built, else None (never triggers a load)."""
+        return self._instances.get(name)
+
+    def get(self, name):
+        """Return the agent, building it on first use. Blocks while another thread is building it."""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        
+        with self._locks[name]:
+            instance = self._instances.get(name)
+            if instance is not None:
+                return instance
+            
+            self._status[name] = {'state': LOADING, 'load_seconds': None, 'error': None}
+            start = time.perf_counter()
+            try:
+                instance = self._build(self._factories[name])
+            except Exception as e:
+                self._status[name] = {'state': ERROR, 'load_seconds': time.perf_counter() - start, 'error': str(e)}
+                raise
+            self._instances[name] = instance
+            self._status[name] = {'state': READY, 'load_seconds': time.perf_counter() - start, 'error': None}
+            return instance
+
+    def _build(self, target):
+        if callable(target):
+            return target()
+        module_name, class_name = target.split(":")
+        return getattr(importlib.import_module(module_name), class_name)()
+
+    def warmup(self, names, max_workers=None):
+        """Build the given components in parallel on background threads; returns immediately."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers or len(names) or 1, thread_name_prefix="warmup")
+        return [self._executor.submit(self._warm, name) for name in names]
+
+    def _warm(self, name):
+        try:
+            self.get(name)
+            print(f"Warmup: {name} ready ({self._status[name]['load_seconds']:.2f}s)")
+        except Exception as e:
+            print(f"Warmup: {name} failed: {e}")
+
+    def status(self):
+        return {name: dict(status) for name, status in self._status.items()}
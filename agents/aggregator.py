@@ -1,10 +1,71 @@
-from agents.llm_selector import get_best_llm
+import numpy as np
+from agents.metrics import record_llm_usage
+from config import AGGREGATION_WEIGHTS, AGGREGATION_MODE
+
+# Cross-verification score implied by the best verdict when no per-source
+# agreement figure is available
+VERDICT_AGREEMENT_SCORES = {'support': 5.0, 'unrelated': 3.0, 'contradict': 1.0}
 
 class AggregatorAgent:
-    def __init__(self):
-        self.llm = get_best_llm("aggregation")
+    def __init__(self, mode=AGGREGATION_MODE, weights=None):
+        """
+        Args:
+            mode: "local" (weighted, deterministic) or "llm" (OpenRouter call, opt-in)
+            weights: overrides config.AGGREGATION_WEIGHTS
+        """
+        self.mode = mode
+        weights = weights or AGGREGATION_WEIGHTS
+        total = sum(weights.values())
+        self.weights = {name: weight / total for name, weight in weights.items()}
+        self._weight_vector = np.array([
+            self.weights.get("evidence_support", 0.0),
+            self.weights.get("source_credibility", 0.0),
+            self.weights.get("cross_verification", 0.0)
+        ])
+        
+        self.llm = None
+        if mode == "llm":
+            from agents.llm_selector import get_best_llm
+            self.llm = get_best_llm("aggregation")
+    
+    def _cross_verification_score(self, verdict, cross_verification_score):
+        if cross_verification_score is not None:
+            return cross_verification_score
+        return VERDICT_AGREEMENT_SCORES.get(verdict, 3.0)
+    
+    def aggregate(self, support_score, source_score, verdict, cross_verification_score=None):
+        if self.mode == "llm":
+            return self._aggregate_with_llm(support_score, source_score, verdict)
+        
+        return float(self.aggregate_many([support_score], [source_score], [verdict], [cross_verification_score])[0])
+    
+    def aggregate_many(self, support_scores, source_scores, verdicts, cross_verification_scores=None):
+        """
+        Vectorized local aggregation for a whole array of claim results.
+        
+        All scores are on a 1-5 scale; missing (None) cross-verification
+        scores are derived from the matching verdict. Returns a numpy array
+        of final 1-5 scores weighted by config.AGGREGATION_WEIGHTS.
+        """
+        if cross_verification_scores is None:
+            cross_verification_scores = [None] * len(verdicts)
+        cross_scores = [
+            self._cross_verification_score(verdict, cross_score)
+            for verdict, cross_score in zip(verdicts, cross_verification_scores)
+        ]
+        components = np.column_stack([
+            np.asarray(support_scores, dtype=float),
+            np.asarray(source_scores, dtype=float),
+            np.asarray(cross_scores, dtype=float)
+        ])
+        return np.clip(components @ self._weight_vector, 1.0, 5.0)
     
-    def aggregate(self, support_score, source_score, verdict):
+    def _invoke(self, prompt):
+        result = self.llm.invoke(prompt)
+        record_llm_usage(self.llm, "aggregation", result)
+        return result
+    
+    def _aggregate_with_llm(self, support_score, source_score, verdict):
         prompt = (
             f"Given:\n"
             f"- Evidence support score: {support_score}/5\n"
@@ -13,7 +74,7 @@ class AggregatorAgent:
             f"Calculate a final credibility score (1-5) by weighing both factors.\n"
             f"Return ONLY a number between 1.0 and 5.0"
         )
-        result = self.llm.invoke(prompt)
+        result = self._invoke(prompt)
         
         if hasattr(result, "content"):
             text = result.content
@@ -26,15 +87,24 @@ class AggregatorAgent:
         except:
             return (support_score + source_score) / 2
     
-    def aggregate_with_explanation(self, support_score, source_score, verdict):
+    def aggregate_with_explanation(self, support_score, source_score, verdict, cross_verification_score=None):
         """XAI: Returns final score with breakdown."""
-        final_score = self.aggregate(support_score, source_score, verdict)
+        final_score = self.aggregate(support_score, source_score, verdict, cross_verification_score)
+        cross_score = self._cross_verification_score(verdict, cross_verification_score)
         
-        # Calculate contributions
-        support_contribution = (support_score / 5.0) * 50  # 50% weight
-        source_contribution = (source_score / 5.0) * 50    # 50% weight
+        # Contributions are the share of the final score each weighted input accounts for
+        weighted = {
+            'evidence_quality': self.weights.get("evidence_support", 0.0) * support_score,
+            'source_credibility': self.weights.get("source_credibility", 0.0) * source_score,
+            'cross_verification': self.weights.get("cross_verification", 0.0) * cross_score
+        }
+        total = sum(weighted.values()) or 1.0
+        contributions = {name: value / total * 100 for name, value in weighted.items()}
         
-        explanation = f"Final score combines evidence quality ({support_score}/5) and source credibility ({source_score}/5)"
+        if self.mode == "llm":
+            explanation = f"Final score estimated by LLM from evidence quality ({support_score}/5) and source credibility ({source_score}/5); contributions show the configured weighting"
+        else:
+            explanation = f"Final score is the weighted combination of evidence quality ({support_score}/5), source credibility ({source_score}/5) and cross-verification ({cross_score:.1f}/5)"
         
         verdict_impact = {
             'support': 'Positive: Evidence directly confirms the claim',
@@ -46,16 +116,24 @@ class AggregatorAgent:
             'final_score': final_score,
             'final_percentage': int((final_score / 5.0) * 100),
             'explanation': explanation,
+            'mode': self.mode,
             'breakdown': {
                 'evidence_quality': {
                     'score': support_score,
-                    'contribution': f"{support_contribution:.1f}%",
+                    'weight': self.weights.get("evidence_support", 0.0),
+                    'contribution': f"{contributions['evidence_quality']:.1f}%",
                     'verdict': verdict,
                     'impact': verdict_impact.get(verdict, 'Unknown')
                 },
                 'source_credibility': {
                     'score': source_score,
-                    'contribution': f"{source_contribution:.1f}%"
+                    'weight': self.weights.get("source_credibility", 0.0),
+                    'contribution': f"{contributions['source_credibility']:.1f}%"
+                },
+                'cross_verification': {
+                    'score': cross_score,
+                    'weight': self.weights.get("cross_verification", 0.0),
+                    'contribution': f"{contributions['cross_verification']:.1f}%"
                 }
             }
         }
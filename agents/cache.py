@@ -0,0 +1,176 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+class MemoryCache:
+    """Thread-safe in-process LRU cache with optional TTL (seconds)."""
+
+    def __init__(self, max_size=1024, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        entry = self.get_entry(key)
+        return default if entry is None else entry[0]
+
+    def get_entry(self, key):
+        """(value, expires_at or None) for a live key, else None."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry
+
+    def set(self, key, value, expires_at=None):
+        """expires_at (epoch seconds) caps the entry's lifetime below ttl, e.g. when backfilled from a slower level."""
+        if self.ttl:
+            deadline = time.time() + self.ttl
+            expires_at = deadline if expires_at is None else min(expires_at, deadline)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+class SQLiteCache:
+    """
+    Persistent key/value cache in a SQLite table.
+    
+    Values are stored as JSON. When max_size is set, the oldest rows are
+    evicted once the table grows past it.
+    """
+
+    def __init__(self, path, table="cache", max_size=None, ttl=None):
+        self.path = path
+        self.table = table
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._writes = 0
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_created_at ON {table} (created_at)")
+
+    def get(self, key, default=None):
+        entry = self.get_entry(key)
+        return default if entry is None else entry[0]
+
+    def get_entry(self, key):
+        """(value, expires_at or None) for a live key, else None."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl and created_at + self.ttl < time.time():
+                with self._conn:
+                    self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                return None
+        return json.loads(value), created_at + self.ttl if self.ttl else None
+
+    def set(self, key, value, expires_at=None):
+        payload = json.dumps(value)
+        # Rows age from created_at, so an earlier expiry is stored as an older row
+        created_at = time.time()
+        if expires_at is not None and self.ttl:
+            created_at = min(created_at, expires_at - self.ttl)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at) VALUES (?, ?, ?)",
+                (key, payload, created_at)
+            )
+            self._writes += 1
+            # Counting rows is a table scan, so only prune every 100 writes
+            if self.max_size and self._writes % 100 == 0:
+                self._evict()
+
+    def _evict(self):
+        if self.ttl:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE created_at < ?", (time.time() - self.ttl,))
+        count = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        if count > self.max_size:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY created_at LIMIT ?)",
+                (count - self.max_size,)
+            )
+
+    def retain_prefix(self, prefix):
+        """Drop every row whose key does not start with prefix (e.g. a stale model version)."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE substr(key, 1, ?) != ?", (len(prefix), prefix)
+            )
+
+    def delete(self, key):
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+class TieredCache:
+    """
+    Looks keys up level by level (fastest first) and backfills the faster
+    levels on a hit, carrying over the remaining lifetime of the entry.
+    """
+
+    def __init__(self, *levels):
+        self.levels = levels
+
+    def get(self, key, default=None):
+        for i, level in enumerate(self.levels):
+            entry = level.get_entry(key)
+            if entry is not None:
+                value, expires_at = entry
+                for faster in self.levels[:i]:
+                    faster.set(key, value, expires_at=expires_at)
+                return value
+        return default
+
+    def set(self, key, value):
+        for level in self.levels:
+            level.set(key, value)
+
+    def delete(self, key):
+        for level in self.levels:
+            level.delete(key)
+
+    def clear(self):
+        for level in self.levels:
+            level.clear()
@@ -1,11 +1,74 @@
-from agents.llm_selector import get_best_llm
+import asyncio
+import re
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from agents.llm_selector import get_best_llm, get_embeddings
+from agents.metrics import record_llm_usage
+from config import (
+    MAX_CLAIMS_PER_ARTICLE, CLAIM_CHUNK_THRESHOLD_CHARS, CLAIM_CHUNK_CHARS,
+    CLAIM_CHUNK_OVERLAP_SENTENCES, CLAIM_CHUNK_CONCURRENCY, CLAIM_DEDUP_SIMILARITY
+)
+
+SENTENCE_END = re.compile(r"(?<=[.!?])[\"')\]]*\s+|\n{2,}")
+
+def split_sentences(text):
+    return [sentence.strip() for sentence in SENTENCE_END.split(text) if sentence and sentence.strip()]
+
+def chunk_text(text, max_chars=CLAIM_CHUNK_CHARS, overlap_sentences=CLAIM_CHUNK_OVERLAP_SENTENCES):
+    """
+    Split text into chunks of whole sentences, each at most max_chars long
+    (a single longer sentence becomes its own chunk). Consecutive chunks share
+    their last/first overlap_sentences sentences so claims spanning a boundary
+    survive, capped at half the chunk so every chunk brings mostly new sentences.
+    """
+    sentences = split_sentences(text)
+    chunks = []
+    start = 0
+    while start < len(sentences):
+        end = start
+        length = 0
+        while end < len(sentences) and (end == start or length + len(sentences[end]) + 1 <= max_chars):
+            length += len(sentences[end]) + 1
+            end += 1
+        chunks.append(" ".join(sentences[start:end]))
+        if end >= len(sentences):
+            break
+        overlap = min(overlap_sentences, (end - start) // 2)
+        start = max(start + 1, end - overlap)
+    return chunks
+
+def dedup_claims(claims, embeddings=None, threshold=CLAIM_DEDUP_SIMILARITY, limit=MAX_CLAIMS_PER_ARTICLE):
+    """
+    Drop exact and near-duplicate claims (cosine similarity >= threshold),
+    keeping the first occurrence, and cap the result at limit.
+    """
+    unique = list(dict.fromkeys(claim for claim in claims if claim))
+    if len(unique) <= 1:
+        return unique[:limit]
+    try:
+        vectors = np.asarray((embeddings or get_embeddings()).embed_documents(unique), dtype=np.float32)
+    except Exception as e:
+        print(f"Claim embedding failed, using exact dedup only: {e}")
+        return unique[:limit]
+
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    similarity = vectors @ vectors.T
+    kept = []
+    for i in range(len(unique)):
+        if not kept or similarity[i, kept].max() < threshold:
+            kept.append(i)
+            if len(kept) >= limit:
+                break
+    return [unique[i] for i in kept]
 
 class ClaimExtractorAgent:
-    def __init__(self):
+    def __init__(self, embeddings=None):
         self.llm = get_best_llm("claim_extraction")
+        # Used to dedup claims of chunked articles; None means the shared local model
+        self.embeddings = embeddings
 
-    def extract_claims(self, article_text):
-        prompt = (
+    def _prompt(self, article_text):
+        return (
             "You are an expert fact-checking assistant. Extract ONLY verifiable, objective, and discrete factual statements from the news article below.\n\n"
             "Requirements:\n"
             "- Each claim must be atomic (one fact per line)\n"
@@ -18,36 +81,80 @@ class ClaimExtractorAgent:
             f"Article:\n{article_text}\n\n"
             "Extracted Claims (one per line):\n"
         )
-        
-        result = self.llm.invoke(prompt)
-        
+
+    def _parse_claims(self, result):
         if hasattr(result, "content"):
             text = result.content
         elif isinstance(result, dict) and "content" in result:
             text = result["content"]
         else:
             text = str(result)
-        
-        claims = [
-            line.strip() 
-            for line in text.split('\n') 
+
+        return [
+            line.strip()
+            for line in text.split('\n')
             if line.strip() and line.strip().upper() != 'NONE'
         ]
-        
+
+    def _extract_chunk(self, chunk):
+        result = self.llm.invoke(self._prompt(chunk))
+        record_llm_usage(self.llm, "claim_extraction", result)
+        return self._parse_claims(result)
+
+    async def _aextract_chunk(self, chunk, semaphore):
+        async with semaphore:
+            result = await self.llm.ainvoke(self._prompt(chunk))
+        record_llm_usage(self.llm, "claim_extraction", result)
+        return self._parse_claims(result)
+
+    def extract_claims(self, article_text):
+        """
+        Claims from the article, or None. Articles longer than
+        CLAIM_CHUNK_THRESHOLD_CHARS are split into overlapping chunks that are
+        extracted concurrently, then near-duplicates are merged.
+        """
+        if len(article_text) <= CLAIM_CHUNK_THRESHOLD_CHARS:
+            claims = self._extract_chunk(article_text)
+            return claims if claims else None
+
+        with ThreadPoolExecutor(max_workers=CLAIM_CHUNK_CONCURRENCY) as pool:
+            per_chunk = list(pool.map(self._extract_chunk, chunk_text(article_text)))
+        claims = dedup_claims([claim for chunk_claims in per_chunk for claim in chunk_claims], self.embeddings)
+        return claims if claims else None
+
+    async def aextract_claims(self, article_text):
+        """Async variant of extract_claims using the LangChain ainvoke path."""
+        semaphore = asyncio.Semaphore(CLAIM_CHUNK_CONCURRENCY)
+        if len(article_text) <= CLAIM_CHUNK_THRESHOLD_CHARS:
+            claims = await self._aextract_chunk(article_text, semaphore)
+            return claims if claims else None
+
+        per_chunk = await asyncio.gather(*(
+            self._aextract_chunk(chunk, semaphore) for chunk in chunk_text(article_text)
+        ))
+        # Embedding the candidates is CPU-bound; keep it off the event loop
+        claims = await asyncio.to_thread(
+            dedup_claims, [claim for chunk_claims in per_chunk for claim in chunk_claims], self.embeddings
+        )
         return claims if claims else None
-    
+
     def extract_claims_with_explanation(self, article_text):
         """XAI: Returns claims with explanations."""
-        claims = self.extract_claims(article_text)
-        
+        return self._explain_claims(self.extract_claims(article_text))
+
+    async def aextract_claims_with_explanation(self, article_text):
+        """Async variant of extract_claims_with_explanation."""
+        return self._explain_claims(await self.aextract_claims(article_text))
+
+    def _explain_claims(self, claims):
         if not claims:
             return {
                 'claims': [],
                 'explanation': 'No verifiable factual claims found in the text. The content may be purely opinion-based or lacks concrete statements.'
             }
-        
+
         explanation = f"Identified {len(claims)} verifiable claim(s) from the article. These are atomic, fact-based statements that can be independently verified."
-        
+
         return {
             'claims': claims,
             'explanation': explanation,
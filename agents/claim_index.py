@@ -0,0 +1,81 @@
+import hashlib
+import json
+import threading
+import time
+from langchain_community.vectorstores import Chroma
+from agents.llm_selector import get_embeddings
+from agents.result_cache import normalize_text
+from config import (
+    KB_PERSIST_DIR, CLAIM_INDEX_COLLECTION, CLAIM_INDEX_SIMILARITY, CLAIM_INDEX_MAX_AGE, CLAIM_INDEX_PRUNE_INTERVAL
+)
+
+class ClaimIndex:
+    """
+    Approximate-nearest-neighbour index of verified claims (Chroma HNSW, cosine
+    space) so paraphrases of an already checked claim can reuse its verdict.
+    Entries older than max_age are deleted on write, at most every prune_interval seconds.
+    """
+    def __init__(self, embeddings=None, persist_directory=KB_PERSIST_DIR, collection_name=CLAIM_INDEX_COLLECTION,
+                 max_age=CLAIM_INDEX_MAX_AGE, prune_interval=CLAIM_INDEX_PRUNE_INTERVAL):
+        self.db = Chroma(
+            collection_name=collection_name,
+            persist_directory=persist_directory,
+            embedding_function=embeddings if embeddings is not None else get_embeddings(),
+            collection_metadata={"hnsw:space": "cosine"}
+        )
+        self.max_age = max_age
+        self.prune_interval = prune_interval
+        self._last_prune = 0.0
+        self._prune_lock = threading.Lock()
+
+    def lookup(self, claim, min_similarity=CLAIM_INDEX_SIMILARITY, max_age=None):
+        """
+        Nearest verified claim verified within the last max_age seconds.
+
+        Returns:
+            dict: {"claim", "similarity", "verified_at", "result"} or None when
+            the nearest fresh neighbour is below min_similarity
+        """
+        max_age = self.max_age if max_age is None else max_age
+        hits = self.db.similarity_search_with_score(
+            claim, k=1, filter={"verified_at": {"$gte": time.time() - max_age}}
+        )
+        if not hits:
+            return None
+        doc, distance = hits[0]
+        similarity = 1.0 - float(distance)
+        if similarity < min_similarity:
+            return None
+        return {
+            "claim": doc.page_content,
+            "similarity": similarity,
+            "verified_at": doc.metadata["verified_at"],
+            "result": json.loads(doc.metadata["result"])
+        }
+
+    def add(self, claim, result):
+        """Insert (or refresh) a verified claim; the id is a hash of the normalized claim."""
+        doc_id = hashlib.sha256(normalize_text(claim).encode("utf-8")).hexdigest()
+        self.db.add_texts(
+            [claim],
+            metadatas=[{"verified_at": time.time(), "result": json.dumps(result)}],
+            ids=[doc_id]
+        )
+        self._maybe_prune()
+    
+    def prune(self):
+        """Delete entries that are too old to be reused; returns how many were removed."""
+        expired = self.db.get(where={"verified_at": {"$lt": time.time() - self.max_age}}, include=[])["ids"]
+        if expired:
+            self.db.delete(ids=expired)
+        return len(expired)
+    
+    def _maybe_prune(self):
+        with self._prune_lock:
+            if time.time() - self._last_prune < self.prune_interval:
+                return
+            self._last_prune = time.time()
+        try:
+            self.prune()
+        except Exception as e:
+            print(f"Claim index pruning failed: {e}")
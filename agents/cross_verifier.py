@@ -1,11 +1,26 @@
+import json
+import re
 from agents.llm_selector import get_best_llm
+from agents.metrics import INVALID_VERDICTS, record_llm_usage
+
+VALID_VERDICTS = ['support', 'contradict', 'unrelated']
 
 class CrossVerifierAgent:
     def __init__(self):
         self.llm = get_best_llm("fact_verification")
 
-    def verify_claim(self, claim, evidence):
-        prompt = (
+    def _invoke(self, prompt):
+        result = self.llm.invoke(prompt)
+        record_llm_usage(self.llm, "fact_verification", result)
+        return result
+
+    async def _ainvoke(self, prompt):
+        result = await self.llm.ainvoke(prompt)
+        record_llm_usage(self.llm, "fact_verification", result)
+        return result
+
+    def _verdict_prompt(self, claim, evidence):
+        return (
             "You are an expert fact-checking AI. Carefully analyze the CLAIM and EVIDENCE below.\n\n"
             "Determine the relationship:\n"
             "- **support**: The evidence confirms or provides factual backing for the claim, even if worded differently\n"
@@ -19,26 +34,9 @@ class CrossVerifierAgent:
             f"EVIDENCE: {evidence}\n\n"
             "Verdict (one word only):"
         )
-        
-        result = self.llm.invoke(prompt)
-        
-        if hasattr(result, "content"):
-            verdict = result.content.strip().lower()
-        elif isinstance(result, dict) and "content" in result:
-            verdict = result["content"].strip().lower()
-        else:
-            verdict = str(result).strip().lower()
-        
-        if verdict not in ['support', 'contradict', 'unrelated']:
-            print(f"Warning: Invalid verdict '{verdict}', defaulting to 'unrelated'")
-            verdict = 'unrelated'
-        
-        return verdict
-    
-    def verify_claim_with_explanation(self, claim, evidence):
-        """XAI: Returns verdict with detailed explanation."""
-        # Get explanation from LLM
-        explanation_prompt = (
+
+    def _explanation_prompt(self, claim, evidence):
+        return (
             "You are an expert fact-checker. Analyze the CLAIM and EVIDENCE, then:\n"
             "1. State your verdict: support, contradict, or unrelated\n"
             "2. Explain WHY in 1-2 sentences\n\n"
@@ -48,15 +46,46 @@ class CrossVerifierAgent:
             "Verdict: [support/contradict/unrelated]\n"
             "Explanation: [Your reasoning]\n"
         )
-        
-        result = self.llm.invoke(explanation_prompt)
-        
+
+    def _batch_prompt(self, claim, evidences, with_explanation):
+        numbered = "\n".join(f"[{i}] {evidence}" for i, evidence in enumerate(evidences))
+        fields = '"index", "verdict" and "explanation" (1-2 sentences)' if with_explanation else '"index" and "verdict"'
+        return (
+            "You are an expert fact-checking AI. Carefully analyze the CLAIM against EACH numbered EVIDENCE snippet.\n\n"
+            "For every snippet determine the relationship:\n"
+            "- **support**: The evidence confirms or provides factual backing for the claim, even if worded differently\n"
+            "- **contradict**: The evidence directly contradicts or disproves the claim\n"
+            "- **unrelated**: The evidence has no clear relevance to the claim\n\n"
+            "Guidelines:\n"
+            "- Paraphrases and synonyms count as support if the meaning matches\n"
+            "- Focus on semantic meaning, not exact wording\n"
+            "- Judge each snippet independently\n\n"
+            f"CLAIM: {claim}\n\n"
+            f"EVIDENCE:\n{numbered}\n\n"
+            f"Respond with ONLY a JSON array containing one object per snippet, with keys {fields}.\n"
+            'Example: [{"index": 0, "verdict": "support"}]\n'
+        )
+
+    def _result_text(self, result):
         if hasattr(result, "content"):
-            response = result.content
+            return result.content
         elif isinstance(result, dict) and "content" in result:
-            response = result["content"]
+            return result["content"]
         else:
-            response = str(result)
+            return str(result)
+
+    def _parse_verdict(self, result):
+        verdict = self._result_text(result).strip().lower()
+        
+        if verdict not in VALID_VERDICTS:
+            print(f"Warning: Invalid verdict '{verdict}', defaulting to 'unrelated'")
+            INVALID_VERDICTS.inc(kind="verdict")
+            verdict = 'unrelated'
+        
+        return verdict
+
+    def _parse_explanation(self, result, claim, evidence):
+        response = self._result_text(result)
         
         # Parse response
         lines = response.strip().split('\n')
@@ -69,12 +98,112 @@ class CrossVerifierAgent:
             elif line.lower().startswith('explanation:'):
                 explanation = line.split(':', 1)[1].strip()
         
-        if verdict not in ['support', 'contradict', 'unrelated']:
+        if verdict not in VALID_VERDICTS:
+            INVALID_VERDICTS.inc(kind="explanation")
             verdict = 'unrelated'
         
+        return self._explanation_result(verdict, explanation, claim, evidence)
+
+    def _explanation_result(self, verdict, explanation, claim, evidence):
         return {
             'verdict': verdict,
             'explanation': explanation,
             'claim': claim,
             'evidence': evidence[:200] + '...' if len(evidence) > 200 else evidence
         }
+
+    def _parse_batch(self, result, claim, evidences, with_explanation):
+        """Parse a batched verdict array; returns None for any snippet that could not be parsed."""
+        parsed = [None] * len(evidences)
+        text = self._result_text(result)
+        match = re.search(r"\[.*\]", text, re.DOTALL)
+        if not match:
+            return parsed
+        try:
+            items = json.loads(match.group(0))
+        except ValueError:
+            return parsed
+        if not isinstance(items, list):
+            return parsed
+        
+        for position, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            index = item.get('index', position)
+            verdict = str(item.get('verdict', '')).strip().lower()
+            if not isinstance(index, int) or not 0 <= index < len(evidences) or verdict not in VALID_VERDICTS:
+                continue
+            if with_explanation:
+                explanation = str(item.get('explanation') or 'No explanation provided')
+                parsed[index] = self._explanation_result(verdict, explanation, claim, evidences[index])
+            else:
+                parsed[index] = verdict
+        
+        return parsed
+
+    def verify_claim(self, claim, evidence):
+        result = self._invoke(self._verdict_prompt(claim, evidence))
+        return self._parse_verdict(result)
+    
+    def verify_claim_with_explanation(self, claim, evidence):
+        """XAI: Returns verdict with detailed explanation."""
+        result = self._invoke(self._explanation_prompt(claim, evidence))
+        return self._parse_explanation(result, claim, evidence)
+
+    async def averify_claim(self, claim, evidence):
+        """Async variant of verify_claim using the LangChain ainvoke path."""
+        result = await self._ainvoke(self._verdict_prompt(claim, evidence))
+        return self._parse_verdict(result)
+
+    async def averify_claim_with_explanation(self, claim, evidence):
+        """Async variant of verify_claim_with_explanation."""
+        result = await self._ainvoke(self._explanation_prompt(claim, evidence))
+        return self._parse_explanation(result, claim, evidence)
+
+    def verify_claim_batch(self, claim, evidences, with_explanation=False):
+        """
+        Judge all evidence snippets for one claim in a single LLM call.
+        
+        Returns a list aligned with evidences: verdict strings, or the
+        verify_claim_with_explanation dicts when with_explanation is set.
+        Snippets missing from an unparseable batch answer are re-checked
+        one at a time.
+        """
+        if not evidences:
+            return []
+        
+        result = self._invoke(self._batch_prompt(claim, evidences, with_explanation))
+        parsed = self._parse_batch(result, claim, evidences, with_explanation)
+        
+        for i, item in enumerate(parsed):
+            if item is None:
+                print(f"Warning: Batch verdict missing for snippet {i}, falling back to single verification")
+                INVALID_VERDICTS.inc(kind="batch")
+                if with_explanation:
+                    parsed[i] = self.verify_claim_with_explanation(claim, evidences[i])
+                else:
+                    parsed[i] = self.verify_claim(claim, evidences[i])
+        
+        return parsed
+
+    async def averify_claim_batch(self, claim, evidences, with_explanation=False):
+        """
+        Async variant of verify_claim_batch. Fallbacks run one at a time: the
+        caller holds a single verification slot for the whole batch, so they
+        must not fan out into more concurrent LLM calls than it accounts for.
+        """
+        if not evidences:
+            return []
+        
+        result = await self._ainvoke(self._batch_prompt(claim, evidences, with_explanation))
+        parsed = self._parse_batch(result, claim, evidences, with_explanation)
+        
+        missing = [i for i, item in enumerate(parsed) if item is None]
+        if missing:
+            print(f"Warning: Batch verdicts missing for snippets {missing}, falling back to single verification")
+            INVALID_VERDICTS.inc(len(missing), kind="batch")
+            verify = self.averify_claim_with_explanation if with_explanation else self.averify_claim
+            for i in missing:
+                parsed[i] = await verify(claim, evidences[i])
+        
+        return parsed
@@ -0,0 +1,106 @@
+from functools import lru_cache
+from urllib.parse import urlsplit
+from config import DOMAIN_DENY_LIST_PATH, DOMAIN_ALLOW_LIST_PATH, DOMAIN_TRUSTED_LIST_PATH, DOMAIN_CACHE_SIZE
+
+# Social/video platforms filtered out of evidence by default
+SOCIAL_PLATFORMS = frozenset([
+    "youtube.com", "youtu.be", "instagram.com",
+    "facebook.com", "fb.com",
+    "twitter.com", "x.com", "reddit.com", "tiktok.com",
+    "pinterest.com", "linkedin.com", "snapchat.com",
+    "quora.com", "medium.com", "tumblr.com"
+])
+
+BLOCKED = "blocked"
+TRUSTED = "trusted"
+ALLOWED = "allowed"
+
+def normalize_host(host):
+    """Lowercase, no port/credentials, no trailing dot, no www. prefix."""
+    host = (host or "").strip().lower()
+    host = host.rsplit("@", 1)[-1]
+    if host.startswith("["):
+        # Bracketed IPv6 literal: keep the address, drop any ":port" after "]"
+        return host.split("]", 1)[0] + "]"
+    host = host.split(":", 1)[0].rstrip(".")
+    if host.startswith("www."):
+        host = host[4:]
+    return host
+
+@lru_cache(maxsize=DOMAIN_CACHE_SIZE)
+def domain_of(url):
+    """Normalized host of a URL ('' if there is none). Bare 'example.com/path' is accepted."""
+    if not url:
+        return ""
+    url = url.strip()
+    if "://" not in url and not url.startswith("//"):
+        url = "//" + url
+    try:
+        return normalize_host(urlsplit(url).netloc)
+    except ValueError:
+        return ""
+
+def source_name(url):
+    """Domain passed to the reputation model ('unknown' without a URL)."""
+    return domain_of(url) or "unknown"
+
+def domain_suffixes(domain):
+    """'a.b.example.com' -> ['a.b.example.com', 'b.example.com', 'example.com', 'com']"""
+    labels = domain.split(".")
+    return [".".join(labels[i:]) for i in range(len(labels))]
+
+def matches(domain, domains):
+    """True if the domain or any parent on a label boundary is in the set (x.com matches m.x.com, not fox.com)."""
+    return bool(domain) and any(suffix in domains for suffix in domain_suffixes(domain))
+
+def load_domain_list(path):
+    """One domain per line, '#' comments allowed. Streams the file, so large lists are fine."""
+    domains = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                domains.add(normalize_host(line))
+    return domains
+
+class DomainPolicy:
+    """
+    Classifies URLs as blocked, trusted or allowed.
+    The allow list overrides the deny list; everything else is allowed.
+    """
+    def __init__(self, deny=SOCIAL_PLATFORMS, allow=(), trusted=()):
+        self.deny = {normalize_host(domain) for domain in deny}
+        self.allow = {normalize_host(domain) for domain in allow}
+        self.trusted = {normalize_host(domain) for domain in trusted}
+
+    @classmethod
+    def from_files(cls, deny_path=DOMAIN_DENY_LIST_PATH, allow_path=DOMAIN_ALLOW_LIST_PATH,
+                   trusted_path=DOMAIN_TRUSTED_LIST_PATH):
+        """Built-in social platforms plus any configured list files."""
+        deny = set(SOCIAL_PLATFORMS)
+        if deny_path:
+            deny |= load_domain_list(deny_path)
+        allow = load_domain_list(allow_path) if allow_path else ()
+        trusted = load_domain_list(trusted_path) if trusted_path else ()
+        return cls(deny=deny, allow=allow, trusted=trusted)
+
+    def classify_domain(self, domain):
+        if not domain:
+            return BLOCKED
+        if matches(domain, self.deny) and not matches(domain, self.allow):
+            return BLOCKED
+        if matches(domain, self.trusted):
+            return TRUSTED
+        return ALLOWED
+
+    def classify(self, url):
+        return self.classify_domain(domain_of(url))
+
+    def classify_many(self, urls):
+        """Classify a whole result list; repeated domains are looked up once."""
+        domains = [domain_of(url) for url in urls]
+        verdicts = {domain: self.classify_domain(domain) for domain in set(domains)}
+        return [verdicts[domain] for domain in domains]
+
+    def is_blocked(self, url):
+        return self.classify(url) == BLOCKED
@@ -0,0 +1,23 @@
+import numpy as np
+from agents.llm_selector import get_embeddings
+from config import EVIDENCE_TOP_K, EVIDENCE_MIN_SIMILARITY
+
+class EvidenceRanker:
+    """Cheap local relevance stage in front of the LLM verifier."""
+    def __init__(self, embeddings=None):
+        self.embeddings = embeddings if embeddings is not None else get_embeddings()
+
+    def similarities(self, claim, snippets):
+        """Cosine similarity of every snippet to the claim (claim and snippets embedded in one batch)."""
+        if not snippets:
+            return np.zeros(0, dtype=np.float32)
+        vectors = np.asarray(self.embeddings.embed_documents([claim] + list(snippets)), dtype=np.float32)
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return vectors[1:] @ vectors[0]
+
+    def select(self, similarities, top_k=EVIDENCE_TOP_K, min_similarity=EVIDENCE_MIN_SIMILARITY):
+        """Indices of the top_k snippets at or above min_similarity, in their original order."""
+        similarities = np.asarray(similarities, dtype=np.float32)
+        candidates = np.flatnonzero(similarities >= min_similarity)
+        best = candidates[np.argsort(-similarities[candidates], kind="stable")[:top_k]]
+        return sorted(best.tolist())
@@ -1,13 +1,15 @@
+import hashlib
 from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from config import KB_PERSIST_DIR, EMBEDDING_MODEL
+from agents.llm_selector import get_embeddings
+from config import KB_PERSIST_DIR
 
 class EvidenceRetrieverAgent:
-    def __init__(self):
-        # Initialize embedding model
-        embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+    def __init__(self, embeddings=None, persist_directory=KB_PERSIST_DIR):
+        # Process-wide embedding model unless one is passed in (e.g. the model server's)
+        if embeddings is None:
+            embeddings = get_embeddings()
         self.db = Chroma(
-            persist_directory=KB_PERSIST_DIR,
+            persist_directory=persist_directory,
             embedding_function=embeddings
         )
         # Create retriever
@@ -17,3 +19,42 @@ class EvidenceRetrieverAgent:
         # Updated for new LangChain core version
         docs = self.retriever.invoke(claim)
         return docs[:max_docs] if docs else []
+
+    def search_with_scores(self, claim, k=5, min_similarity=0.0):
+        """
+        Local KB lookup shaped like SerpAPI organic_results.
+        
+        Returns:
+            list[dict]: {"link", "snippet", "title", "similarity"} for hits with
+            relevance >= min_similarity, best first
+        """
+        hits = self.db.similarity_search_with_relevance_scores(claim, k=k)
+        results = []
+        for doc, similarity in hits:
+            if similarity < min_similarity:
+                continue
+            metadata = doc.metadata or {}
+            results.append({
+                "link": metadata.get("link", ""),
+                "title": metadata.get("title", ""),
+                "snippet": doc.page_content,
+                "similarity": float(similarity),
+                "source": "knowledge_base"
+            })
+        return results
+
+    def add_web_results(self, claim, results):
+        """Write web evidence back into the KB. Ids are content hashes, so re-adding is a no-op upsert."""
+        texts, metadatas, ids = [], [], []
+        for result in results:
+            snippet = result.get("snippet", "")
+            link = result.get("link", "")
+            doc_id = hashlib.sha256(f"{link}\x00{snippet}".encode("utf-8")).hexdigest()
+            if not snippet or not link or doc_id in ids:
+                continue
+            texts.append(snippet)
+            metadatas.append({"link": link, "title": result.get("title") or "", "claim": claim})
+            ids.append(doc_id)
+        if texts:
+            self.db.add_texts(texts, metadatas=metadatas, ids=ids)
+        return len(texts)
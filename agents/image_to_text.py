@@ -1,12 +1,112 @@
+import asyncio
+import io
+import multiprocessing
 import os
+import threading
+import httpx
 import requests
-from PIL import Image
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageOps
+from agents.metrics import UPSTREAM_ERRORS
+from agents.llm_selector import get_http_clients
 import time
+from config import (
+    OCR_TARGET_DPI, OCR_MAX_DIMENSION, OCR_TESSERACT_WORKERS,
+    OCR_SPACE_API_URL, OCR_SPACE_TIMEOUT, OCR_SPACE_MAX_RETRIES, OCR_SPACE_BACKOFF_SECONDS,
+    OCR_HEDGE_AFTER_SECONDS, OCR_MAX_CONNECTIONS
+)
+
+def otsu_threshold(histogram):
+    """Otsu's threshold for a 256-bin grayscale histogram."""
+    total = sum(histogram)
+    weighted_total = sum(i * count for i, count in enumerate(histogram))
+    background = background_sum = 0
+    best_threshold, best_variance = 127, -1.0
+    for i, count in enumerate(histogram):
+        background += count
+        if background == 0:
+            continue
+        foreground = total - background
+        if foreground == 0:
+            break
+        background_sum += i * count
+        mean_background = background_sum / background
+        mean_foreground = (weighted_total - background_sum) / foreground
+        variance = background * foreground * (mean_background - mean_foreground) ** 2
+        if variance > best_variance:
+            best_threshold, best_variance = i, variance
+    return best_threshold
+
+def preprocess_image(image):
+    """
+    Prepare an image for Tesseract: fix EXIF rotation, downscale to
+    OCR_TARGET_DPI (or cap the longest side at OCR_MAX_DIMENSION when the
+    DPI is unknown), convert to grayscale and binarize with Otsu's threshold.
+    """
+    image = ImageOps.exif_transpose(image).convert("L")
+    
+    scale = 1.0
+    dpi = image.info.get("dpi")
+    if dpi and dpi[0] and dpi[0] > OCR_TARGET_DPI:
+        scale = OCR_TARGET_DPI / float(dpi[0])
+    longest = max(image.size)
+    if longest * scale > OCR_MAX_DIMENSION:
+        scale = OCR_MAX_DIMENSION / float(longest)
+    if scale < 1.0:
+        size = (max(1, int(image.width * scale)), max(1, int(image.height * scale)))
+        image = image.resize(size, Image.LANCZOS)
+    
+    threshold = otsu_threshold(image.histogram())
+    return image.point(lambda value: 255 if value > threshold else 0, mode="1")
+
+def _tesseract_from_bytes(image_bytes):
+    """Runs in a pool process: decode, preprocess and OCR one image."""
+    import pytesseract
+    image = preprocess_image(Image.open(io.BytesIO(image_bytes)))
+    return pytesseract.image_to_string(image).strip()
+
+# Shared by all agents in this process; created on first Tesseract fallback
+_tesseract_pool = None
+_tesseract_pool_lock = threading.Lock()
+# Bounds queued + running Tesseract jobs so a burst of uploads can't pile up unbounded
+_tesseract_slots = threading.BoundedSemaphore(OCR_TESSERACT_WORKERS * 2)
+
+def get_tesseract_pool():
+    global _tesseract_pool
+    with _tesseract_pool_lock:
+        if _tesseract_pool is None:
+            # spawn, not fork: the API process is multithreaded (threadpool, torch, httpx)
+            _tesseract_pool = ProcessPoolExecutor(
+                max_workers=OCR_TESSERACT_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _tesseract_pool
+
+def _ocr_space_payload(api_key):
+    return {
+        'apikey': api_key,
+        'language': 'eng',
+        'isOverlayRequired': False,
+        'detectOrientation': True,
+        'scale': True,
+        'OCREngine': 2
+    }
+
+def _parse_ocr_space(result):
+    """Text from an OCR.space response, or None if it reported an error."""
+    if result.get('IsErroredOnProcessing'):
+        print(f"OCR.space Error: {result.get('ErrorMessage', 'Unknown error')}")
+        return None
+    text_parts = [page.get('ParsedText', '') for page in result.get('ParsedResults', [])]
+    return '\n'.join(text_parts).strip()
 
 class ImageToTextAgent:
-    def __init__(self):
+    def __init__(self, api_url=None, hedge_after=OCR_HEDGE_AFTER_SECONDS, http_client=None):
         self.api_key = os.environ.get("OCR_SPACE_API_KEY")
-        self.api_url = "https://api.ocr.space/parse/image"
+        self.api_url = api_url or OCR_SPACE_API_URL
+        # Seconds to wait on OCR.space before also starting Tesseract; None disables hedging
+        self.hedge_after = hedge_after
+        # httpx.AsyncClient; defaults to the process-wide pooled OCR.space client
+        self._async_client = http_client
         self.use_tesseract = False
         
         # Try to import pytesseract as fallback
@@ -21,70 +121,60 @@ class ImageToTextAgent:
         
     def extract_text_from_file(self, image_path):
         """Extract text from a local image file with retry and fallback."""
+        try:
+            with open(image_path, 'rb') as f:
+                image_bytes = f.read()
+        except FileNotFoundError:
+            print(f"Error: Image file not found: {image_path}")
+            return ""
+        return self.extract_text_from_bytes(image_bytes, os.path.basename(image_path))
+    
+    def extract_text_from_bytes(self, image_bytes, filename="image.png"):
+        """Extract text from in-memory image bytes (no temp files) with retry and fallback."""
         # Try OCR.space API first (with retries)
-        text = self._extract_with_ocr_space(image_path)
+        text = self._extract_with_ocr_space(image_bytes, filename)
         
         # If OCR.space fails and Tesseract is available, use it as fallback
         if not text and self.use_tesseract:
             print("OCR.space failed, trying Tesseract fallback...")
-            text = self._extract_with_tesseract(image_path)
+            text = self._extract_with_tesseract(image_bytes)
         
         return text
     
-    def _extract_with_ocr_space(self, image_path, max_retries=3):
+    def _extract_with_ocr_space(self, image_bytes, filename="image.png", max_retries=3):
         """Extract text using OCR.space API with retries."""
         for attempt in range(max_retries):
             try:
-                with open(image_path, 'rb') as f:
-                    payload = {
-                        'apikey': self.api_key,
-                        'language': 'eng',
-                        'isOverlayRequired': False,
-                        'detectOrientation': True,
-                        'scale': True,
-                        'OCREngine': 2
-                    }
-                    files = {'file': f}
-                    
-                    # Increased timeout to 60 seconds
-                    response = requests.post(self.api_url, data=payload, files=files, timeout=60)
-                    result = response.json()
-                    
-                    if result.get('IsErroredOnProcessing'):
-                        error_msg = result.get('ErrorMessage', 'Unknown error')
-                        print(f"OCR.space Error: {error_msg}")
-                        continue
-                    
-                    text_parts = []
-                    for page in result.get('ParsedResults', []):
-                        text_parts.append(page.get('ParsedText', ''))
-                    
-                    extracted_text = '\n'.join(text_parts).strip()
-                    
-                    if extracted_text:
-                        return extracted_text
-                    else:
-                        print(f"Attempt {attempt + 1}: No text extracted from OCR.space")
+                payload = _ocr_space_payload(self.api_key)
+                files = {'file': (filename, image_bytes)}
+                
+                # Increased timeout to 60 seconds
+                response = requests.post(self.api_url, data=payload, files=files, timeout=60)
+                extracted_text = _parse_ocr_space(response.json())
+                if extracted_text is None:
+                    continue
+                
+                if extracted_text:
+                    return extracted_text
+                else:
+                    print(f"Attempt {attempt + 1}: No text extracted from OCR.space")
                         
             except requests.exceptions.Timeout:
                 print(f"Attempt {attempt + 1}: OCR.space timeout")
                 time.sleep(2)  # Wait before retry
-            except FileNotFoundError:
-                print(f"Error: Image file not found: {image_path}")
-                return ""
             except Exception as e:
                 print(f"Attempt {attempt + 1}: OCR.space error: {e}")
                 time.sleep(2)
         
         print("All OCR.space attempts failed")
+        UPSTREAM_ERRORS.inc(service="ocr_space")
         return ""
     
-    def _extract_with_tesseract(self, image_path):
-        """Extract text using local Tesseract OCR as fallback."""
+    def _extract_with_tesseract(self, image_bytes):
+        """Extract text using local Tesseract OCR in the shared process pool."""
         try:
-            img = Image.open(image_path)
-            text = self.pytesseract.image_to_string(img)
-            extracted_text = text.strip()
+            with _tesseract_slots:
+                extracted_text = get_tesseract_pool().submit(_tesseract_from_bytes, image_bytes).result()
             
             if extracted_text:
                 print("✓ Text extracted successfully with Tesseract")
@@ -95,7 +185,80 @@ class ImageToTextAgent:
                 
         except Exception as e:
             print(f"Tesseract extraction error: {e}")
+            UPSTREAM_ERRORS.inc(service="tesseract")
+            return ""
+    
+    def _get_async_client(self):
+        if self._async_client is None:
+            _, self._async_client = get_http_clients(
+                "ocr_space", timeout=OCR_SPACE_TIMEOUT, max_connections=OCR_MAX_CONNECTIONS
+            )
+        return self._async_client
+    
+    async def _aextract_with_ocr_space(self, image_bytes, filename="image.png", max_retries=OCR_SPACE_MAX_RETRIES):
+        """Async OCR.space call with exponential backoff between attempts."""
+        client = self._get_async_client()
+        for attempt in range(max_retries):
+            if attempt:
+                await asyncio.sleep(OCR_SPACE_BACKOFF_SECONDS * 2 ** (attempt - 1))
+            try:
+                response = await client.post(
+                    self.api_url,
+                    data=_ocr_space_payload(self.api_key),
+                    files={'file': (filename, image_bytes)}
+                )
+                extracted_text = _parse_ocr_space(response.json())
+                if extracted_text:
+                    return extracted_text
+                if extracted_text is not None:
+                    print(f"Attempt {attempt + 1}: No text extracted from OCR.space")
+            except httpx.TimeoutException:
+                print(f"Attempt {attempt + 1}: OCR.space timeout")
+            except Exception as e:
+                print(f"Attempt {attempt + 1}: OCR.space error: {e}")
+        
+        print("All OCR.space attempts failed")
+        UPSTREAM_ERRORS.inc(service="ocr_space")
+        return ""
+    
+    async def _aextract_with_tesseract(self, image_bytes):
+        # The blocking wait on the process pool happens off the event loop
+        return await asyncio.to_thread(self._extract_with_tesseract, image_bytes)
+    
+    async def aextract_text_from_bytes(self, image_bytes, filename="image.png"):
+        """
+        Non-blocking OCR. If OCR.space has not answered within hedge_after
+        seconds, Tesseract is started alongside it and the first non-empty
+        result wins.
+        """
+        ocr_task = asyncio.create_task(self._aextract_with_ocr_space(image_bytes, filename))
+        
+        if not self.use_tesseract:
+            return await ocr_task
+        
+        if self.hedge_after is None:
+            text = await ocr_task
+            if not text:
+                print("OCR.space failed, trying Tesseract fallback...")
+                text = await self._aextract_with_tesseract(image_bytes)
+            return text
+        
+        done, _ = await asyncio.wait({ocr_task}, timeout=self.hedge_after)
+        if done and ocr_task.result():
+            return ocr_task.result()
+        
+        print("OCR.space slow or failed, hedging with Tesseract...")
+        pending = {ocr_task, asyncio.create_task(self._aextract_with_tesseract(image_bytes))}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.result():
+                        return task.result()
             return ""
+        finally:
+            for task in pending:
+                task.cancel()
     
     def extract_text_from_url(self, image_url, max_retries=3):
         """Extract text from an image URL with retries."""
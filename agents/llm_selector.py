@@ -1,20 +1,177 @@
 import os
-from langchain_mistralai import ChatMistralAI
-from langchain_groq import ChatGroq
-from langchain_openai import ChatOpenAI
-from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Provider SDKs and transformers are imported per task so that building a
+# chat-only agent does not pull in torch/transformers (or other providers)
+
+# Process-wide registry: every chat client, HTTP pool and local model is built
+# once and shared by all agents in this process
+_registry = {}
+_registry_info = {}
+_registry_lock = threading.Lock()
+_key_locks = {}
+
+def _shared(key, kind, build):
+    """Return the registered object for key, building it (once, even under concurrency) if needed."""
+    instance = _registry.get(key)
+    if instance is not None:
+        return instance
+    with _registry_lock:
+        lock = _key_locks.setdefault(key, threading.Lock())
+    with lock:
+        instance = _registry.get(key)
+        if instance is None:
+            start = time.perf_counter()
+            instance = build()
+            _registry_info[key] = {
+                'kind': kind,
+                'load_seconds': round(time.perf_counter() - start, 3),
+                'memory_bytes': _memory_bytes(instance)
+            }
+            _registry[key] = instance
+    return instance
+
+def _module_bytes(module):
+    """Parameter + buffer bytes of a torch module."""
+    tensors = list(module.parameters()) + list(module.buffers())
+    return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+def _memory_bytes(instance):
+    """Best-effort resident size of a loaded model (None for remote clients)."""
+    try:
+        if getattr(instance, "name", None) == "torch":  # reputation TorchBackend
+            return _module_bytes(instance.model)
+        if hasattr(instance, "size_bytes"):  # quantized / ONNX backends
+            return instance.size_bytes()
+        # HuggingFaceEmbeddings -> SentenceTransformer
+        client = getattr(instance, "_client", None) or getattr(instance, "client", None)
+        if client is not None and hasattr(client, "parameters"):
+            return _module_bytes(client)
+        model = getattr(instance, "model", None)  # transformers pipeline
+        if model is not None and hasattr(model, "parameters"):
+            return _module_bytes(model)
+    except Exception as e:
+        print(f"Could not measure memory for {type(instance).__name__}: {e}")
+    return None
+
+def get_http_clients(provider, timeout=60, max_connections=None):
+    """
+    (httpx.Client, httpx.AsyncClient) with pooled keep-alive connections, one
+    pair per provider. timeout/max_connections apply when the pair is first built.
+    """
+    import httpx
+    if max_connections is None:
+        limits = httpx.Limits(max_keepalive_connections=20)
+    else:
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    return _shared(("http", provider), "http_client", lambda: (
+        httpx.Client(timeout=timeout, limits=limits),
+        httpx.AsyncClient(timeout=timeout, limits=limits)
+    ))
+
+async def close_http_clients():
+    """Close and unregister every shared HTTP client pair (application shutdown)."""
+    with _registry_lock:
+        keys = [key for key in _registry if key[0] == "http"]
+        pairs = [_registry.pop(key) for key in keys]
+        for key in keys:
+            _registry_info.pop(key, None)
+    for client, async_client in pairs:
+        client.close()
+        await async_client.aclose()
+
+def get_search_client():
+    """Shared SerpAPI client (SERPAPI_API_KEY from the environment)."""
+    def build():
+        from langchain_community.utilities import SerpAPIWrapper
+        api_key = os.getenv("SERPAPI_API_KEY")
+        if not api_key:
+            raise ValueError("SerpAPI key not found. Please set SERPAPI_API_KEY in your environment or .env file.")
+        return SerpAPIWrapper(serpapi_api_key=api_key)
+    return _shared(("search", "serpapi"), "search_client", build)
+
+def _openrouter_llm():
+    from langchain_openai import ChatOpenAI
+    http_client, http_async_client = get_http_clients("openrouter")
+    return ChatOpenAI(
+        api_key=os.environ["OPENROUTER_API_KEY"], base_url="https://openrouter.ai/api/v1", model="openrouter/auto",
+        http_client=http_client, http_async_client=http_async_client
+    )
+
+def _groq_llm():
+    from langchain_groq import ChatGroq
+    http_client, http_async_client = get_http_clients("groq")
+    return ChatGroq(
+        model="llama-3.3-70b-versatile", api_key=os.environ["GROQ_API_KEY"],
+        http_client=http_client, http_async_client=http_async_client
+    )
+
+def _mistral_llm():
+    # ChatMistralAI builds its own authenticated httpx clients; sharing the instance shares them
+    from langchain_mistralai import ChatMistralAI
+    return ChatMistralAI(model="mistral-tiny", api_key=os.environ["MISTRALAI_API_KEY"])
+
+def _scoring_pipeline():
+    # Reuses the reputation model's weights instead of loading a second copy
+    from transformers import pipeline
+    backend = get_model("reputation", "torch")
+    return pipeline("text-classification", model=backend.model, tokenizer=backend.tokenizer)
 
 def get_best_llm(task):
+    """Shared client for a task; tasks served by the same provider/model get the same instance."""
     if task == "claim_extraction":
-        return ChatMistralAI(model="mistral-tiny", api_key=os.environ["MISTRALAI_API_KEY"])
+        return _shared(("llm", "mistral", "mistral-tiny"), "chat_client", _mistral_llm)
     elif task == "fact_verification":
-        return ChatGroq(model="llama-3.3-70b-versatile", api_key=os.environ["GROQ_API_KEY"])
+        return _shared(("llm", "groq", "llama-3.3-70b-versatile"), "chat_client", _groq_llm)
     elif task == "scoring":
-          model_dir = "./models/deberta_reputation_model_export"
-          tokenizer = AutoTokenizer.from_pretrained(model_dir)
-          model = AutoModelForSequenceClassification.from_pretrained(model_dir)
-          return pipeline("text-classification", model=model, tokenizer=tokenizer)
+        return _shared(("pipeline", "scoring"), "pipeline", _scoring_pipeline)
     elif task == "aggregation":
-        return ChatOpenAI(api_key=os.environ["OPENROUTER_API_KEY"], base_url="https://openrouter.ai/api/v1", model="openrouter/auto")
+        return _shared(("llm", "openrouter", "openrouter/auto"), "chat_client", _openrouter_llm)
     else:
-        return ChatOpenAI(api_key=os.environ["OPENROUTER_API_KEY"], base_url="https://openrouter.ai/api/v1", model="openrouter/auto")
+        return _shared(("llm", "openrouter", "openrouter/auto"), "chat_client", _openrouter_llm)
+
+def get_model(name, backend=None):
+    """
+    Shared local model. "reputation" is the DeBERTa source-credibility model
+    loaded with the given backend ("torch", "torch-int8" or "onnx"); "nli" is
+    the cascade verifier's NLI cross-encoder.
+    """
+    if name == "reputation":
+        from agents.reputation_backend import load_backend
+        from config import REPUTATION_MODEL_PATH, REPUTATION_BACKEND
+        backend = backend or REPUTATION_BACKEND
+        return _shared(("model", "reputation", backend), "model", lambda: load_backend(backend, REPUTATION_MODEL_PATH))
+    if name == "nli":
+        from agents.nli_verifier import NliModel
+        from config import NLI_MODEL
+        return _shared(("model", "nli", NLI_MODEL), "model", lambda: NliModel(NLI_MODEL))
+    raise ValueError(f"Unknown model '{name}'")
+
+def get_embeddings():
+    """Shared sentence-embedding model used by the knowledge base."""
+    def build():
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+        from config import EMBEDDING_MODEL
+        return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+    return _shared(("embeddings",), "embeddings", build)
+
+def memory_report():
+    """Loaded models/clients with their load time and estimated memory, plus process peak RSS."""
+    peak_rss = None
+    if resource is not None:
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform != "darwin":
+            peak_rss *= 1024  # kilobytes on Linux
+    entries = {"/".join(key): dict(info) for key, info in list(_registry_info.items())}
+    return {
+        'loaded': entries,
+        'models_bytes': sum(info['memory_bytes'] or 0 for info in entries.values()),
+        'process_peak_rss_bytes': peak_rss
+    }
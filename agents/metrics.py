@@ -0,0 +1,167 @@
+"""
+In-process metrics: timing spans, latency histograms and counters, rendered
+in the Prometheus text exposition format for GET /metrics.
+
+Spans also accumulate into a per-request collector (see collect_timings) so
+an endpoint can report its own stage timings.
+"""
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(str(labels.get(name, "")) for name in self.labelnames), 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {series[-2]}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+STAGE_LATENCY = Histogram(
+    "factcheck_stage_duration_seconds", "Latency of pipeline stages.", ["stage"]
+)
+CACHE_REQUESTS = Counter(
+    "factcheck_cache_requests_total", "Cache lookups by cache and result (hit, stale, miss).", ["cache", "result"]
+)
+UPSTREAM_ERRORS = Counter(
+    "factcheck_upstream_errors_total", "Failed calls to external services.", ["service"]
+)
+INVALID_VERDICTS = Counter(
+    "factcheck_invalid_verdict_fallbacks_total", "LLM verdicts that could not be parsed and fell back.", ["kind"]
+)
+LLM_TOKENS = Counter(
+    "factcheck_llm_tokens_total", "LLM token usage reported by the provider.", ["provider", "task", "type"]
+)
+EVIDENCE_PRUNED = Counter(
+    "factcheck_evidence_pruned_total", "Evidence snippets marked unrelated by the relevance stage instead of the LLM."
+)
+NLI_PAIRS = Counter(
+    "factcheck_nli_pairs_total", "Cascade verifier pairs by route (local, escalated, fallback).", ["route"]
+)
+REQUESTS = Counter(
+    "factcheck_requests_total", "Verification requests by endpoint and status code.", ["endpoint", "status"]
+)
+
+METRICS = [STAGE_LATENCY, CACHE_REQUESTS, UPSTREAM_ERRORS, INVALID_VERDICTS, LLM_TOKENS, EVIDENCE_PRUNED, NLI_PAIRS, REQUESTS]
+
+def render_prometheus():
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# Per-request stage timings; set by collect_timings() and shared with tasks spawned inside it
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+@contextmanager
+def collect_timings():
+    """Collect {stage: {'count', 'total_ms'}} for spans inside this block (reuses an enclosing collector)."""
+    timings = _request_timings.get()
+    if timings is not None:
+        yield timings
+        return
+    timings = {}
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+@contextmanager
+def span(stage):
+    """Time a pipeline stage into STAGE_LATENCY and the current request's timings."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_LATENCY.observe(elapsed, stage=stage)
+        timings = _request_timings.get()
+        if timings is not None:
+            entry = timings.setdefault(stage, {'count': 0, 'total_ms': 0.0})
+            entry['count'] += 1
+            entry['total_ms'] += elapsed * 1000
+
+def server_timing_header(timings):
+    """Server-Timing header value, one metric per stage (durations summed over repeats)."""
+    return ", ".join(f"{stage};dur={entry['total_ms']:.1f}" for stage, entry in timings.items())
+
+def record_llm_usage(llm, task, result):
+    """Count input/output tokens from a LangChain message's usage_metadata, if the provider reports it."""
+    usage = getattr(result, "usage_metadata", None)
+    if not usage:
+        return
+    try:
+        provider = llm._llm_type
+    except Exception:
+        provider = type(llm).__name__
+    for kind in ("input_tokens", "output_tokens"):
+        if usage.get(kind):
+            LLM_TOKENS.inc(usage[kind], provider=provider, task=task, type=kind.split("_")[0])
@@ -0,0 +1,71 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+class MicroBatcher:
+    """
+    Dynamic micro-batching for single-item inference calls.
+    
+    Callers on any thread submit one item and block until its result is
+    ready. A background thread gathers items for up to max_wait_ms (or
+    until max_batch_size is reached) and runs them through batch_fn in a
+    single call. batch_fn must return one result per input, in order.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=32, max_wait_ms=5):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, item):
+        """Queue one item and wait for its result."""
+        return self.submit_async(item).result()
+
+    def submit_async(self, item):
+        """Queue one item and return a concurrent.futures.Future for its result."""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def _ensure_worker(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._process(batch)
+
+    def _process(self, batch):
+        items = [item for item, _ in batch]
+        try:
+            results = list(self.batch_fn(items))
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+        if len(results) < len(batch):
+            # Never leave a caller blocked on a result that will not come
+            error = RuntimeError(f"batch_fn returned {len(results)} results for {len(batch)} inputs")
+            for _, future in batch[len(results):]:
+                future.set_exception(error)
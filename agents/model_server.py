@@ -0,0 +1,212 @@
+"""
+Out-of-process model server shared by all API workers on a host.
+
+One server owns the DeBERTa source scorer and the sentence embedding model
+in a pool of model processes. API workers connect over a local socket
+(multiprocessing.connection, authenticated with MODEL_SERVER_AUTHKEY) and stay free
+of torch entirely, so memory no longer grows with the number of uvicorn
+workers and model processes can be sized independently.
+
+Run (from the repository root), with the same MODEL_SERVER_AUTHKEY exported
+for the server and the API workers:
+    python -m agents.model_server --address /tmp/factcheck-models.sock --workers 2
+
+and start the API with MODEL_SERVER_ADDRESS set to the same address.
+"""
+import argparse
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future
+from multiprocessing.connection import Client, Listener
+
+from config import MODEL_SERVER_ADDRESS, MODEL_SERVER_AUTHKEY, MODEL_SERVER_WORKERS
+
+def parse_address(address):
+    """'host:port' -> (host, port) TCP address; anything else is a Unix socket path."""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit() and "/" not in address:
+        return (host or "127.0.0.1", int(port))
+    return address
+
+def require_authkey(authkey):
+    """
+    multiprocessing.connection unpickles every message, so anyone holding the
+    key can run code in the server: there is no default, it must be configured.
+    """
+    if not authkey:
+        raise ValueError("Model server authkey not set (MODEL_SERVER_AUTHKEY)")
+    return authkey.encode()
+
+# ---------------------------------------------------------------------------
+# Server side (model processes)
+# ---------------------------------------------------------------------------
+
+_models = {}
+
+def _init_worker(threads):
+    """Pool initializer: load the models once per model process."""
+    if threads:
+        import torch
+        torch.set_num_threads(threads)
+    from agents.source_scorer import SourceScorerAgent
+    from agents.llm_selector import get_embeddings
+    _models['scorer'] = SourceScorerAgent()
+    _models['embeddings'] = get_embeddings()
+    print(f"Model process {os.getpid()} ready")
+
+def _dispatch(method, payload):
+    if method == "score_sources":
+        return _models['scorer'].score_sources(payload)
+    if method == "model_version":
+        return _models['scorer'].model_version
+    if method == "embed_documents":
+        return _models['embeddings'].embed_documents(payload)
+    if method == "embed_query":
+        return _models['embeddings'].embed_query(payload)
+    if method == "ping":
+        return os.getpid()
+    raise ValueError(f"Unknown model server method: {method}")
+
+class ModelServer:
+    """Accepts client connections and fans requests out to a pool of model processes."""
+
+    def __init__(self, address=MODEL_SERVER_ADDRESS, authkey=MODEL_SERVER_AUTHKEY, workers=MODEL_SERVER_WORKERS, threads=None):
+        self.address = parse_address(address)
+        self.authkey = require_authkey(authkey)
+        self.pool = multiprocessing.get_context("spawn").Pool(
+            processes=workers, initializer=_init_worker, initargs=(threads,)
+        )
+
+    def serve_forever(self):
+        if isinstance(self.address, str):
+            if os.path.exists(self.address):
+                os.unlink(self.address)
+            # Socket file is created owner-only (0600) so other local users cannot connect
+            umask = os.umask(0o177)
+            try:
+                listener = Listener(self.address, authkey=self.authkey)
+            finally:
+                os.umask(umask)
+        else:
+            listener = Listener(self.address, authkey=self.authkey)
+        with listener:
+            print(f"Model server listening on {self.address}")
+            while True:
+                conn = listener.accept()
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+    def _serve_connection(self, conn):
+        send_lock = threading.Lock()
+
+        def reply(message):
+            with send_lock:
+                try:
+                    conn.send(message)
+                except (OSError, EOFError):
+                    pass  # client disconnected
+
+        try:
+            while True:
+                request_id, method, payload = conn.recv()
+                self.pool.apply_async(
+                    _dispatch, (method, payload),
+                    callback=lambda result, rid=request_id: reply((rid, True, result)),
+                    error_callback=lambda error, rid=request_id: reply((rid, False, repr(error)))
+                )
+        except (EOFError, OSError):
+            conn.close()
+
+# ---------------------------------------------------------------------------
+# Client side (API workers)
+# ---------------------------------------------------------------------------
+
+class ModelServerClient:
+    """Thread-safe client multiplexing concurrent requests over one connection."""
+
+    def __init__(self, address=MODEL_SERVER_ADDRESS, authkey=MODEL_SERVER_AUTHKEY, timeout=30):
+        if not address:
+            raise ValueError("Model server address not set (MODEL_SERVER_ADDRESS)")
+        self.address = parse_address(address)
+        self.authkey = require_authkey(authkey)
+        self.timeout = timeout
+        self._conn = None
+        self._pending = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = Client(self.address, authkey=self.authkey)
+            threading.Thread(target=self._receive, args=(self._conn,), daemon=True).start()
+        return self._conn
+
+    def _receive(self, conn):
+        try:
+            while True:
+                request_id, ok, result = conn.recv()
+                future = self._pending.pop(request_id, None)
+                if future is None:
+                    continue
+                if ok:
+                    future.set_result(result)
+                else:
+                    future.set_exception(RuntimeError(f"Model server error: {result}"))
+        except (EOFError, OSError) as e:
+            with self._lock:
+                if self._conn is conn:
+                    self._conn = None
+                pending, self._pending = self._pending, {}
+            for future in pending.values():
+                future.set_exception(ConnectionError(f"Model server connection lost: {e}"))
+
+    def call(self, method, payload=None):
+        future = Future()
+        request_id = next(self._ids)
+        try:
+            with self._lock:
+                conn = self._connect()
+                self._pending[request_id] = future
+                conn.send((request_id, method, payload))
+            return future.result(timeout=self.timeout)
+        finally:
+            # Timed-out or failed calls must not leave their future behind
+            self._pending.pop(request_id, None)
+
+class RemoteSourceScorer:
+    """SourceScorerAgent stand-in whose model lives in the model server."""
+
+    def __init__(self, client=None):
+        self.client = client or ModelServerClient()
+        self.model_version = self.client.call("model_version")
+
+    def score_source(self, source_type, source_name):
+        return self.score_sources([source_name])[0]
+
+    def score_sources(self, source_names):
+        return self.client.call("score_sources", list(source_names))
+
+class RemoteEmbeddings:
+    """LangChain Embeddings-compatible proxy for the model server's embedding model."""
+
+    def __init__(self, client=None):
+        self.client = client or ModelServerClient()
+
+    def embed_documents(self, texts):
+        return self.client.call("embed_documents", list(texts))
+
+    def embed_query(self, text):
+        return self.client.call("embed_query", text)
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared model server for API workers")
+    parser.add_argument("--address", default=MODEL_SERVER_ADDRESS or "/tmp/factcheck-models.sock",
+                        help="Unix socket path or host:port")
+    parser.add_argument("--workers", type=int, default=MODEL_SERVER_WORKERS, help="number of model processes")
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads per model process")
+    args = parser.parse_args()
+    ModelServer(args.address, workers=args.workers, threads=args.threads).serve_forever()
+
+if __name__ == "__main__":
+    main()
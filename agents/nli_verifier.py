@@ -0,0 +1,158 @@
+import asyncio
+import threading
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+from agents.llm_selector import get_model
+from agents.metrics import NLI_PAIRS, span
+from config import NLI_MODEL, NLI_CONFIDENCE_THRESHOLD, NLI_BATCH_SIZE, NLI_ESCALATION_TIMEOUT
+
+MAX_LENGTH = 256
+
+def verdict_for_label(label):
+    """Map an NLI label (entailment/contradiction/neutral) to our verdict vocabulary."""
+    label = label.lower()
+    if label.startswith("entail"):
+        return "support"
+    if label.startswith("contradict"):
+        return "contradict"
+    return "unrelated"
+
+class NliModel:
+    """Small local NLI cross-encoder, batched on CPU."""
+    def __init__(self, model_name=NLI_MODEL):
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        self.model.eval()
+        self.verdicts = [verdict_for_label(self.model.config.id2label[i]) for i in range(self.model.config.num_labels)]
+
+    def predict(self, pairs, batch_size=NLI_BATCH_SIZE):
+        """
+        Args:
+            pairs: list of (premise, hypothesis), i.e. (evidence, claim)
+
+        Returns:
+            list[(verdict, confidence)] with confidence the top class probability
+        """
+        predictions = []
+        for start in range(0, len(pairs), batch_size):
+            premises, hypotheses = zip(*pairs[start:start + batch_size])
+            with torch.no_grad():
+                inputs = self.tokenizer(
+                    list(premises), list(hypotheses),
+                    return_tensors="pt", truncation=True, max_length=MAX_LENGTH, padding=True
+                )
+                probabilities = torch.softmax(self.model(**inputs).logits, dim=-1)
+            confidences, indices = probabilities.max(dim=-1)
+            predictions.extend(
+                (self.verdicts[index], float(confidence))
+                for index, confidence in zip(indices.tolist(), confidences.tolist())
+            )
+        return predictions
+
+class CascadeVerifierAgent:
+    """
+    Drop-in replacement for CrossVerifierAgent: every (claim, snippet) pair is
+    judged by the local NLI model and only pairs below NLI_CONFIDENCE_THRESHOLD
+    are escalated to the LLM verifier. If the LLM is unavailable, fails or
+    exceeds NLI_ESCALATION_TIMEOUT, the local verdicts are kept.
+
+    Routing is counted in factcheck_nli_pairs_total{route=local|escalated|fallback};
+    escalation_rate() reports the share of pairs sent to the LLM by this instance.
+    """
+    def __init__(self, threshold=NLI_CONFIDENCE_THRESHOLD, escalation_timeout=NLI_ESCALATION_TIMEOUT):
+        self.threshold = threshold
+        self.escalation_timeout = escalation_timeout
+        self.nli = get_model("nli")
+        # Updated from threadpool workers (see _local)
+        self.pairs_total = 0
+        self.pairs_escalated = 0
+        self._counts_lock = threading.Lock()
+        try:
+            from agents.cross_verifier import CrossVerifierAgent
+            self.llm_verifier = CrossVerifierAgent()
+        except Exception as e:
+            print(f"LLM verifier unavailable, cascade will answer from the local NLI model only: {e}")
+            self.llm_verifier = None
+
+    def escalation_rate(self):
+        with self._counts_lock:
+            return self.pairs_escalated / self.pairs_total if self.pairs_total else 0.0
+
+    def _local(self, claim, evidences, with_explanation):
+        """Local verdicts for every snippet and the indices that need escalation."""
+        with span("nli_verification"):
+            predictions = self.nli.predict([(evidence, claim) for evidence in evidences])
+        results = []
+        for evidence, (verdict, confidence) in zip(evidences, predictions):
+            if with_explanation:
+                results.append({
+                    'verdict': verdict,
+                    'explanation': f"Local NLI model judged '{verdict}' with confidence {confidence:.2f}",
+                    'claim': claim,
+                    'evidence': evidence[:200] + '...' if len(evidence) > 200 else evidence
+                })
+            else:
+                results.append(verdict)
+        escalate = [i for i, (_, confidence) in enumerate(predictions) if confidence < self.threshold]
+        if self.llm_verifier is None:
+            escalate = []
+        with self._counts_lock:
+            self.pairs_total += len(evidences)
+            self.pairs_escalated += len(escalate)
+        NLI_PAIRS.inc(len(evidences) - len(escalate), route="local")
+        NLI_PAIRS.inc(len(escalate), route="escalated")
+        return results, escalate
+
+    def _merge(self, results, escalate, escalated_results):
+        for i, item in zip(escalate, escalated_results):
+            results[i] = item
+        return results
+
+    def verify_claim_batch(self, claim, evidences, with_explanation=False):
+        if not evidences:
+            return []
+        results, escalate = self._local(claim, evidences, with_explanation)
+        if not escalate:
+            return results
+        try:
+            with span("llm_escalation"):
+                escalated = self.llm_verifier.verify_claim_batch(
+                    claim, [evidences[i] for i in escalate], with_explanation=with_explanation
+                )
+        except Exception as e:
+            print(f"LLM escalation failed, keeping local NLI verdicts: {e}")
+            NLI_PAIRS.inc(len(escalate), route="fallback")
+            return results
+        return self._merge(results, escalate, escalated)
+
+    async def averify_claim_batch(self, claim, evidences, with_explanation=False):
+        if not evidences:
+            return []
+        results, escalate = await asyncio.to_thread(self._local, claim, evidences, with_explanation)
+        if not escalate:
+            return results
+        try:
+            with span("llm_escalation"):
+                escalated = await asyncio.wait_for(
+                    self.llm_verifier.averify_claim_batch(
+                        claim, [evidences[i] for i in escalate], with_explanation=with_explanation
+                    ),
+                    timeout=self.escalation_timeout
+                )
+        except Exception as e:
+            print(f"LLM escalation failed or timed out, keeping local NLI verdicts: {e!r}")
+            NLI_PAIRS.inc(len(escalate), route="fallback")
+            return results
+        return self._merge(results, escalate, escalated)
+
+    def verify_claim(self, claim, evidence):
+        return self.verify_claim_batch(claim, [evidence])[0]
+
+    def verify_claim_with_explanation(self, claim, evidence):
+        return self.verify_claim_batch(claim, [evidence], with_explanation=True)[0]
+
+    async def averify_claim(self, claim, evidence):
+        return (await self.averify_claim_batch(claim, [evidence]))[0]
+
+    async def averify_claim_with_explanation(self, claim, evidence):
+        return (await self.averify_claim_batch(claim, [evidence], with_explanation=True))[0]
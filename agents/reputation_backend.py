@@ -0,0 +1,208 @@
+"""
+Pluggable inference backends for the DeBERTa reputation (regression) model.
+
+Backends:
+    torch       eager float32 PyTorch (reference)
+    torch-int8  dynamic int8-quantized Linear layers, CPU only
+    onnx        exported graph run with ONNX Runtime on CPU
+
+Every backend exposes predict(texts) -> numpy array of raw regression
+outputs, plus a fingerprint() that is folded into the score cache key so
+switching backends never serves scores produced by another one.
+
+CLI (from the repository root):
+    python -m agents.reputation_backend export [--output PATH]
+    python -m agents.reputation_backend check [--backend onnx] [--domains FILE]
+"""
+import argparse
+import io
+import os
+import time
+
+import numpy as np
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+from config import REPUTATION_MODEL_PATH, REPUTATION_ONNX_PATH, REPUTATION_REFERENCE_DOMAINS
+
+MAX_LENGTH = 128
+ONNX_INPUTS = ["input_ids", "attention_mask"]
+
+class TorchBackend:
+    name = "torch"
+
+    def __init__(self, model_path=REPUTATION_MODEL_PATH):
+        self.tokenizer = AutoTokenizer.from_pretrained(model_path)
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_path)
+        self.model.eval()
+        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.model.to(self.device)
+
+    def fingerprint(self):
+        return self.name
+
+    def predict(self, texts):
+        with torch.no_grad():
+            inputs = self.tokenizer(
+                list(texts),
+                return_tensors="pt",
+                truncation=True,
+                max_length=MAX_LENGTH,
+                padding=True
+            )
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+            logits = self.model(**inputs).logits
+        # Single regression output per input
+        return logits[:, 0].float().cpu().numpy()
+
+    def size_bytes(self):
+        buffer = io.BytesIO()
+        torch.save(self.model.state_dict(), buffer)
+        return buffer.tell()
+
+class QuantizedTorchBackend(TorchBackend):
+    name = "torch-int8"
+
+    def __init__(self, model_path=REPUTATION_MODEL_PATH):
+        super().__init__(model_path)
+        # Dynamic quantization is CPU-only: weights int8, activations quantized on the fly
+        self.device = torch.device("cpu")
+        self.model = torch.quantization.quantize_dynamic(
+            self.model.to(self.device), {torch.nn.Linear}, dtype=torch.qint8
+        )
+
+class OnnxBackend:
+    name = "onnx"
+
+    def __init__(self, model_path=REPUTATION_MODEL_PATH, onnx_path=REPUTATION_ONNX_PATH):
+        try:
+            import onnxruntime
+        except ImportError:
+            raise ImportError("ONNX backend requires onnxruntime (pip install onnxruntime)")
+        if not os.path.exists(onnx_path):
+            raise FileNotFoundError(
+                f"{onnx_path} not found; run: python -m agents.reputation_backend export --output {onnx_path}"
+            )
+        
+        self.onnx_path = onnx_path
+        self.tokenizer = AutoTokenizer.from_pretrained(model_path)
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [node.name for node in self.session.get_inputs()]
+
+    def fingerprint(self):
+        stat = os.stat(self.onnx_path)
+        return f"{self.name}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def predict(self, texts):
+        inputs = self.tokenizer(
+            list(texts),
+            return_tensors="np",
+            truncation=True,
+            max_length=MAX_LENGTH,
+            padding=True
+        )
+        feed = {name: inputs[name].astype(np.int64) for name in self.input_names}
+        logits = self.session.run(None, feed)[0]
+        return logits[:, 0].astype(np.float32)
+
+    def size_bytes(self):
+        return os.path.getsize(self.onnx_path)
+
+BACKENDS = {
+    TorchBackend.name: TorchBackend,
+    QuantizedTorchBackend.name: QuantizedTorchBackend,
+    OnnxBackend.name: OnnxBackend,
+}
+
+def load_backend(name, model_path=REPUTATION_MODEL_PATH):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown reputation backend '{name}' (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name](model_path)
+
+def export_onnx(model_path=REPUTATION_MODEL_PATH, output_path=REPUTATION_ONNX_PATH, opset=17):
+    """Export the float model to ONNX with dynamic batch and sequence axes."""
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+    model = AutoModelForSequenceClassification.from_pretrained(model_path)
+    model.eval()
+    
+    sample = tokenizer(["reuters.com", "example.co.uk"], return_tensors="pt", padding=True)
+    sample = {name: sample[name] for name in ONNX_INPUTS}
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in ONNX_INPUTS}
+    dynamic_axes["logits"] = {0: "batch"}
+    
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample,),
+            output_path,
+            input_names=ONNX_INPUTS,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset
+        )
+    return output_path
+
+def load_reference_domains(path=REPUTATION_REFERENCE_DOMAINS):
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+def check_drift(backend_name, domains, model_path=REPUTATION_MODEL_PATH, batch_size=32):
+    """Compare a backend against the float torch model on a domain list (scores clamped to 1-5)."""
+    reference = TorchBackend(model_path)
+    candidate = load_backend(backend_name, model_path)
+    
+    def run(backend):
+        start = time.perf_counter()
+        outputs = np.concatenate([
+            backend.predict(domains[i:i + batch_size]) for i in range(0, len(domains), batch_size)
+        ])
+        return np.clip(outputs, 1.0, 5.0), time.perf_counter() - start
+    
+    reference_scores, reference_seconds = run(reference)
+    candidate_scores, candidate_seconds = run(candidate)
+    drift = np.abs(candidate_scores - reference_scores)
+    worst = int(drift.argmax())
+    return {
+        'backend': backend_name,
+        'domains': len(domains),
+        'max_abs_drift': float(drift.max()),
+        'mean_abs_drift': float(drift.mean()),
+        'worst_domain': domains[worst],
+        'reference_seconds': reference_seconds,
+        'backend_seconds': candidate_seconds,
+        'reference_size_mb': reference.size_bytes() / 1e6,
+        'backend_size_mb': candidate.size_bytes() / 1e6
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Reputation model inference backends")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    export_parser = subparsers.add_parser("export", help="export the float model to ONNX")
+    export_parser.add_argument("--output", default=REPUTATION_ONNX_PATH)
+    export_parser.add_argument("--opset", type=int, default=17)
+    
+    check_parser = subparsers.add_parser("check", help="report score drift against the float model")
+    check_parser.add_argument("--backend", default="onnx", choices=sorted(BACKENDS))
+    check_parser.add_argument("--domains", default=REPUTATION_REFERENCE_DOMAINS)
+    check_parser.add_argument("--max-drift", type=float, default=None,
+                              help="exit non-zero if max drift exceeds this many score points")
+    
+    args = parser.parse_args()
+    if args.command == "export":
+        print(f"Exported ONNX model to {export_onnx(output_path=args.output, opset=args.opset)}")
+        return
+    
+    report = check_drift(args.backend, load_reference_domains(args.domains))
+    for key, value in report.items():
+        print(f"{key:>18}: {value:.4f}" if isinstance(value, float) else f"{key:>18}: {value}")
+    if args.max_drift is not None and report['max_abs_drift'] > args.max_drift:
+        raise SystemExit(f"Max drift {report['max_abs_drift']:.4f} exceeds {args.max_drift}")
+
+if __name__ == "__main__":
+    main()
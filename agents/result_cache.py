@@ -0,0 +1,74 @@
+import hashlib
+import re
+from agents.metrics import CACHE_REQUESTS
+from agents.cache import MemoryCache, SQLiteCache, TieredCache
+from config import (
+    RESULT_CACHE_BACKEND, RESULT_CACHE_PATH,
+    CLAIM_CACHE_TTL, CLAIM_CACHE_SIZE, VERDICT_CACHE_TTL, VERDICT_CACHE_SIZE
+)
+
+def normalize_text(text):
+    """Whitespace- and case-insensitive form of a text used for content addressing."""
+    return re.sub(r"\s+", " ", text or "").strip().lower()
+
+def content_key(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(normalize_text(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+class ResultCache:
+    """
+    Content-addressed cache for the verification pipeline.
+    
+    Two levels, each with its own TTL and size bound:
+    - claims:   normalized input text -> extracted claims
+    - verdicts: (claim, snippet) -> verdict and explanation
+    
+    backend is "memory" (in-process LRU) or "sqlite" (LRU in front of a
+    persistent SQLite table).
+    """
+
+    def __init__(self, backend=RESULT_CACHE_BACKEND, path=RESULT_CACHE_PATH):
+        self.backend = backend
+        self.claims = self._level(backend, path, "claim_cache", CLAIM_CACHE_SIZE, CLAIM_CACHE_TTL)
+        self.verdicts = self._level(backend, path, "verdict_cache", VERDICT_CACHE_SIZE, VERDICT_CACHE_TTL)
+
+    def _level(self, backend, path, table, max_size, ttl):
+        if backend == "sqlite":
+            return TieredCache(
+                MemoryCache(max_size=min(max_size, 1024), ttl=ttl),
+                SQLiteCache(path, table=table, max_size=max_size, ttl=ttl)
+            )
+        if backend == "memory":
+            return MemoryCache(max_size=max_size, ttl=ttl)
+        raise ValueError(f"Unknown result cache backend: {backend}")
+
+    def get_claims(self, text, include_explanation):
+        """Cached claim extraction result ({'claims': [...], ...}) or None."""
+        result = self.claims.get(content_key(text))
+        if result is None or (include_explanation and 'explanation' not in result):
+            CACHE_REQUESTS.inc(cache="claims", result="miss")
+            return None
+        CACHE_REQUESTS.inc(cache="claims", result="hit")
+        return result
+
+    def set_claims(self, text, claim_result):
+        self.claims.set(content_key(text), claim_result)
+
+    def get_verdict(self, claim, snippet, include_explanation):
+        """Cached {'verdict', 'explanation'} for a (claim, snippet) pair or None."""
+        result = self.verdicts.get(content_key(claim, snippet))
+        if result is None or (include_explanation and result.get('explanation') is None):
+            CACHE_REQUESTS.inc(cache="verdict", result="miss")
+            return None
+        CACHE_REQUESTS.inc(cache="verdict", result="hit")
+        return result
+
+    def set_verdict(self, claim, snippet, verdict_result):
+        if isinstance(verdict_result, dict):
+            entry = {'verdict': verdict_result['verdict'], 'explanation': verdict_result.get('explanation')}
+        else:
+            entry = {'verdict': verdict_result, 'explanation': None}
+        self.verdicts.set(content_key(claim, snippet), entry)
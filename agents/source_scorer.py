@@ -1,19 +1,66 @@
-import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
+import hashlib
+import os
+import threading
+from agents.metrics import CACHE_REQUESTS
+from agents.cache import MemoryCache, SQLiteCache, TieredCache
+from agents.micro_batcher import MicroBatcher
+from agents.llm_selector import get_model
+from config import (
+    REPUTATION_MODEL_PATH, REPUTATION_BACKEND, SOURCE_SCORE_CACHE_PATH, SOURCE_SCORE_CACHE_SIZE,
+    SOURCE_SCORE_MICRO_BATCHING, SOURCE_SCORE_BATCH_SIZE, SOURCE_SCORE_BATCH_WAIT_MS,
+    SOURCE_LIME_EXPLANATIONS, LIME_BATCH_SIZE
+)
+
+def normalize_domain(source_name):
+    """Canonical cache key for a domain: lowercase, no trailing dot, no www. prefix."""
+    domain = (source_name or "").strip().lower().rstrip(".")
+    if domain.startswith("www."):
+        domain = domain[4:]
+    return domain
+
+def model_fingerprint(model_path):
+    """Short hash over the relative path, size and mtime of every file in the model directory."""
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(model_path):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            stat = os.stat(path)
+            digest.update(f"{os.path.relpath(path, model_path)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()[:16]
 
 class SourceScorerAgent:
-    def __init__(self):
+    def __init__(self, backend=REPUTATION_BACKEND):
         # Path to your finetuned DeBERTa model
-        model_path = "models/deberta_reputation_model_export"
+        model_path = REPUTATION_MODEL_PATH
         
-        self.tokenizer = AutoTokenizer.from_pretrained(model_path)
-        self.model = AutoModelForSequenceClassification.from_pretrained(model_path)
-        self.model.eval()
+        # "torch", "torch-int8" or "onnx" (see agents/reputation_backend.py); shared process-wide
+        self.backend = get_model("reputation", backend)
+        self.tokenizer = self.backend.tokenizer
         
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.model.to(self.device)
+        # Scores are cached per (model version, domain); any change to the
+        # exported model files or the backend produces a new version and drops stale rows
+        self.model_version = hashlib.sha256(
+            f"{model_fingerprint(model_path)}:{self.backend.fingerprint()}".encode()
+        ).hexdigest()[:16]
+        store = SQLiteCache(SOURCE_SCORE_CACHE_PATH, table="source_scores")
+        store.retain_prefix(f"{self.model_version}:")
+        self.cache = TieredCache(MemoryCache(max_size=SOURCE_SCORE_CACHE_SIZE), store)
+        
+        # Cold domains from concurrent requests are coalesced into padded batches
+        self.batcher = None
+        if SOURCE_SCORE_MICRO_BATCHING:
+            self.batcher = MicroBatcher(
+                self._predict_batch,
+                max_batch_size=SOURCE_SCORE_BATCH_SIZE,
+                max_wait_ms=SOURCE_SCORE_BATCH_WAIT_MS
+            )
         
-        print(f"Source scoring model loaded on: {self.device}")
+        # LIME explainer (shap/lime imports) is only built when first needed
+        self.explainer = None
+        self._explainer_lock = threading.Lock()
+        
+        print(f"Source scoring model loaded with {self.backend.name} backend (version {self.model_version})")
     
     def score_source(self, source_type, source_name):
         """
@@ -26,32 +73,106 @@ class SourceScorerAgent:
         Returns:
             float: credibility score 1-5
         """
-        # Format input based on your training data format
-        # If you trained with just the domain:
-        text = source_name
+        domain = normalize_domain(source_name)
+        key = f"{self.model_version}:{domain}"
+        
+        score = self.cache.get(key)
+        CACHE_REQUESTS.inc(cache="source_score", result="miss" if score is None else "hit")
+        if score is None:
+            if self.batcher is not None:
+                score = self.batcher.submit(domain)
+            else:
+                score = self._predict_batch([domain])[0]
+            self.cache.set(key, score)
         
+        return score
+    
+    def score_sources(self, source_names):
+        """
+        Batch variant of score_source.
+        
+        Args:
+            source_names: list of domains, e.g. ["cnn.com", "bbc.com"]
+        
+        Returns:
+            list[float]: credibility scores 1-5, aligned with source_names
+        """
+        domains = [normalize_domain(name) for name in source_names]
+        scores = {}
+        missing = []
+        for domain in dict.fromkeys(domains):
+            score = self.cache.get(f"{self.model_version}:{domain}")
+            if score is None:
+                missing.append(domain)
+            else:
+                scores[domain] = score
+        CACHE_REQUESTS.inc(len(scores), cache="source_score", result="hit")
+        CACHE_REQUESTS.inc(len(missing), cache="source_score", result="miss")
+        
+        if self.batcher is not None:
+            # Submit every miss before waiting so they share forward passes with
+            # cold domains from concurrent requests
+            futures = [self.batcher.submit_async(domain) for domain in missing]
+            predicted = zip(missing, [future.result() for future in futures])
+        else:
+            predicted = []
+            for start in range(0, len(missing), SOURCE_SCORE_BATCH_SIZE):
+                chunk = missing[start:start + SOURCE_SCORE_BATCH_SIZE]
+                predicted.extend(zip(chunk, self._predict_batch(chunk)))
+        for domain, score in predicted:
+            self.cache.set(f"{self.model_version}:{domain}", score)
+            scores[domain] = score
+        
+        return [scores[domain] for domain in domains]
+    
+    def score_source_with_explanation(self, source_type, source_name, score=None):
+        """
+        XAI: score_source plus an explanation. With SOURCE_LIME_EXPLANATIONS the
+        domain tokens driving the score are found with LIME; perturbed samples
+        go through the model in LIME_BATCH_SIZE batches and explanations are
+        cached per (model version, domain).
+        
+        Pass score when the caller already has it, so the domain isn't scored twice.
+        """
+        if score is None:
+            score = self.score_source(source_type, source_name)
+        result = {
+            'score': score,
+            'explanation': f'Source credibility: {score}/5',
+            'contributing_factors': ['Domain reputation'],
+            'is_trusted': score >= 4.0
+        }
+        if not SOURCE_LIME_EXPLANATIONS:
+            return result
+        
+        lime = self._get_explainer().explain_text_classification(
+            normalize_domain(source_name), self._lime_predict, model_version=self.model_version
+        )
+        if 'error' not in lime:
+            result['contributing_factors'] = [
+                f"'{word}' {'raises' if weight > 0 else 'lowers'} credibility ({weight:+.2f})"
+                for word, weight in lime['feature_importance'][:5]
+            ]
+            result['lime'] = lime
+        return result
+    
+    def _get_explainer(self):
+        # Requests run in threadpool workers; build the explainer exactly once
+        with self._explainer_lock:
+            if self.explainer is None:
+                from agents.xai_explainer import XAIExplainer, batched_predict_fn
+                self._lime_predict = batched_predict_fn(self._predict_batch, batch_size=LIME_BATCH_SIZE)
+                self.explainer = XAIExplainer()
+        return self.explainer
+    
+    def _predict_batch(self, texts):
+        # Format input based on your training data format
+        # If you trained with just the domain, texts are the domains themselves.
         # If you trained with "source_type | source_name" format:
-        # text = f"{source_type} | {source_name}"
-        
-        with torch.no_grad():
-            inputs = self.tokenizer(
-                text, 
-                return_tensors="pt", 
-                truncation=True, 
-                max_length=128,
-                padding=True
-            )
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
-            
-            outputs = self.model(**inputs)
-            logits = outputs.logits.cpu().numpy().flatten()
-            
-            # If your model outputs a single regression value:
-            score = float(logits[0])
-            
-            # If your model outputs class probabilities (5 classes for scores 1-5):
-            # predicted_class = logits.argmax()
-            # score = float(predicted_class + 1)  # Convert 0-4 to 1-5
-        
-        # Clamp score between 1-5
-        return max(1.0, min(5.0, score))
+        # texts = [f"{source_type} | {name}" for name in source_names]
+        
+        # The model outputs a single regression value per input
+        scores = self.backend.predict(texts)
+        
+        # Clamp scores between 1-5
+        return [max(1.0, min(5.0, float(score))) for score in scores]
@@ -1,20 +1,87 @@
-import os
-from langchain_community.utilities import SerpAPIWrapper
+import threading
+import time
+from concurrent.futures import Future
 from dotenv import load_dotenv
+from agents.cache import MemoryCache
+from agents.llm_selector import get_search_client
+from agents.result_cache import normalize_text
+from agents.metrics import CACHE_REQUESTS, UPSTREAM_ERRORS
+from config import SEARCH_CACHE_TTL, SEARCH_CACHE_STALE_TTL, SEARCH_CACHE_SIZE
 
 load_dotenv()
 
+# Cache key for a search query: lowercase with collapsed whitespace
+normalize_query = normalize_text
+
 class WebRetrieverAgent:
-    def __init__(self):
-        api_key = os.getenv("SERPAPI_API_KEY")
-        if not api_key:
-            raise ValueError("SerpAPI key not found. Please set SERPAPI_API_KEY in your environment or .env file.")
-        self.search = SerpAPIWrapper(serpapi_api_key=api_key)
+    def __init__(self, cache_ttl=SEARCH_CACHE_TTL, stale_ttl=SEARCH_CACHE_STALE_TTL, cache_size=SEARCH_CACHE_SIZE,
+                 search=None):
+        """
+        Args:
+            cache_ttl: seconds a cached result list is served as fresh
+            stale_ttl: extra seconds a stale result list is still served while
+                it is refreshed in the background (0 disables stale-while-revalidate)
+            cache_size: max number of cached queries
+            search: object with SerpAPIWrapper's results(query); defaults to the shared SerpAPI client
+        """
+        self.search = search if search is not None else get_search_client()
+        
+        self.cache_ttl = cache_ttl
+        self.stale_ttl = stale_ttl
+        self.cache = MemoryCache(max_size=cache_size, ttl=cache_ttl + stale_ttl)
+        # Single-flight: normalized query -> Future shared by every caller waiting on it
+        self._inflight = {}
+        self._lock = threading.Lock()
 
     def get_live_evidence(self, claim):
         # Return top web results as a list of dicts with snippet/link
+        key = normalize_query(claim)
+        entry = self.cache.get(key)
+        if entry is not None:
+            if time.time() - entry['fetched_at'] >= self.cache_ttl:
+                CACHE_REQUESTS.inc(cache="search", result="stale")
+                self._refresh_in_background(key, claim)
+            else:
+                CACHE_REQUESTS.inc(cache="search", result="hit")
+            return list(entry['results'])
+        
+        CACHE_REQUESTS.inc(cache="search", result="miss")
+        future, is_leader = self._join(key)
+        if is_leader:
+            self._fetch(key, claim, future)
+        return list(future.result())
+
+    def _search(self, claim):
         results = self.search.results(claim)  # Use results() not run()
         if "organic_results" in results:
             return results["organic_results"]  # list of dict
         else:
             return []
+
+    def _join(self, key):
+        """Return the in-flight Future for key, creating it if this caller is the first."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            return future, True
+
+    def _fetch(self, key, claim, future):
+        try:
+            results = self._search(claim)
+            self.cache.set(key, {'results': results, 'fetched_at': time.time()})
+            future.set_result(results)
+        except Exception as e:
+            print(f"SerpAPI search failed for '{claim}': {e}")
+            UPSTREAM_ERRORS.inc(service="serpapi")
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _refresh_in_background(self, key, claim):
+        future, is_leader = self._join(key)
+        if is_leader:
+            threading.Thread(target=self._fetch, args=(key, claim, future), daemon=True).start()
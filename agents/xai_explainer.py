@@ -1,7 +1,26 @@
 import shap
 from lime.lime_text import LimeTextExplainer
 import numpy as np
-from typing import Dict, List, Any
+from typing import Callable, Dict, List, Any, Optional
+from agents.cache import MemoryCache
+from config import LIME_NUM_SAMPLES, LIME_BATCH_SIZE, XAI_CACHE_SIZE, XAI_INCLUDE_HTML
+
+def batched_predict_fn(score_fn: Callable[[List[str]], List[float]], batch_size: int = LIME_BATCH_SIZE,
+                       min_score: float = 1.0, max_score: float = 5.0):
+    """
+    Adapt a batched regression scorer (e.g. SourceScorerAgent._predict_batch,
+    1-5 credibility) to the [P(fake), P(real)] predict_fn LIME expects.
+    LIME's perturbed samples are scored in chunks of batch_size, so an
+    explanation costs one forward pass per chunk instead of one per sample.
+    """
+    def predict_fn(texts):
+        texts = list(texts)
+        scores = []
+        for start in range(0, len(texts), batch_size):
+            scores.extend(score_fn(texts[start:start + batch_size]))
+        real = np.clip((np.asarray(scores, dtype=np.float64) - min_score) / (max_score - min_score), 0.0, 1.0)
+        return np.column_stack([1.0 - real, real])
+    return predict_fn
 
 class XAIExplainer:
     """
@@ -9,50 +28,75 @@ class XAIExplainer:
     Uses SHAP and LIME (both free and open-source)
     """
     
-    def __init__(self):
+    def __init__(self, num_samples: int = LIME_NUM_SAMPLES, cache_size: int = XAI_CACHE_SIZE):
         self.lime_explainer = LimeTextExplainer(class_names=['fake', 'real'])
+        self.num_samples = num_samples
+        # Explanations keyed by (model_version, method, input, settings); only used when model_version is given
+        self.cache = MemoryCache(max_size=cache_size)
         
-    def explain_text_classification(self, text: str, predict_fn, method='lime', num_features=10) -> Dict:
+    def explain_text_classification(self, text: str, predict_fn, method='lime', num_features=10,
+                                    model_version: Optional[str] = None, num_samples: Optional[int] = None,
+                                    include_html: bool = XAI_INCLUDE_HTML) -> Dict:
         """
         Explain text classification decision
         
         Args:
             text: Input text to explain
             predict_fn: Model prediction function that returns probabilities
+                (see batched_predict_fn for regression scorers)
             method: 'lime' or 'shap'
             num_features: Number of important features to show
+            model_version: Version of the model behind predict_fn; enables the explanation cache
+            num_samples: LIME perturbation budget (defaults to LIME_NUM_SAMPLES)
+            include_html: Also render LIME's HTML visualisation
             
         Returns:
             Dictionary with explanation data
         """
+        num_samples = num_samples or self.num_samples
+        key = None
+        if model_version is not None:
+            key = f"{model_version}\x00{method}\x00{num_features}\x00{num_samples}\x00{include_html}\x00{text}"
+            cached = self.cache.get(key)
+            if cached is not None:
+                return dict(cached)
+        
         if method == 'lime':
-            return self._explain_with_lime(text, predict_fn, num_features)
+            explanation = self._explain_with_lime(text, predict_fn, num_features, num_samples, include_html)
         else:
-            return self._explain_with_shap(text, predict_fn)
+            explanation = self._explain_with_shap(text, predict_fn)
+        
+        if key is not None and 'error' not in explanation:
+            self.cache.set(key, explanation)
+        return explanation
     
-    def _explain_with_lime(self, text: str, predict_fn, num_features: int) -> Dict:
+    def _explain_with_lime(self, text: str, predict_fn, num_features: int, num_samples: int = LIME_NUM_SAMPLES,
+                           include_html: bool = XAI_INCLUDE_HTML) -> Dict:
         """Use LIME for explanation"""
         try:
             exp = self.lime_explainer.explain_instance(
                 text,
                 predict_fn,
-                num_features=num_features
+                num_features=num_features,
+                num_samples=num_samples
             )
             
             # Get feature importance
             feature_importance = exp.as_list()
             
-            # Get prediction probabilities
-            proba = predict_fn([text])[0]
+            # LIME already scored the unperturbed input; no extra model call needed
+            proba = exp.predict_proba
             
-            return {
+            explanation = {
                 'method': 'LIME',
                 'feature_importance': feature_importance,
                 'important_words': [feat[0] for feat in feature_importance[:5]],
                 'prediction_confidence': float(max(proba)),
-                'explanation_html': exp.as_html(),
-                'raw_explanation': exp
+                'num_samples': num_samples
             }
+            if include_html:
+                explanation['explanation_html'] = exp.as_html()
+            return explanation
         except Exception as e:
             return {
                 'method': 'LIME',
@@ -1,20 +1,28 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+from fastapi.concurrency import run_in_threadpool
 from typing import Optional, Dict, Any, List
-import os
-import tempfile
-
-from agents.claim_extractor import ClaimExtractorAgent
-from agents.evidence_retriever import EvidenceRetrieverAgent
-from agents.cross_verifier import CrossVerifierAgent
-from agents.source_scorer import SourceScorerAgent
-from agents.aggregator import AggregatorAgent
-from agents.web_retriever import WebRetrieverAgent
-from agents.image_to_text import ImageToTextAgent
-from urllib.parse import urlparse
-import os
-import tempfile
+import asyncio
+import json
+from contextlib import contextmanager
+
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
+from fastapi.encoders import jsonable_encoder
+from agents.agent_registry import AgentRegistry, READY, ERROR
+from agents.result_cache import ResultCache, normalize_text
+from agents.llm_selector import memory_report, close_http_clients
+from agents.metrics import (
+    span, collect_timings, server_timing_header, render_prometheus, UPSTREAM_ERRORS, REQUESTS, CACHE_REQUESTS,
+    EVIDENCE_PRUNED
+)
+from agents.domain_policy import DomainPolicy, source_name, BLOCKED, TRUSTED
+from config import (
+    MAX_CLAIMS_PER_ARTICLE, VERIFICATION_CONCURRENCY_PER_REQUEST, VERIFICATION_CONCURRENCY_PER_PROCESS,
+    VERIFICATION_BATCH_MODE, KB_SIMILARITY_THRESHOLD, KB_MIN_HITS, KB_WRITE_BACK,
+    WARMUP_ON_STARTUP, WARMUP_COMPONENTS, BATCH_MAX_ITEMS, BATCH_CONCURRENCY_PER_PROCESS,
+    MODEL_SERVER_ADDRESS, CLAIM_INDEX_ENABLED, EVIDENCE_RANKING_ENABLED, VERIFIER_MODE
+)
 from dotenv import load_dotenv
 load_dotenv(override=True)
 # Initialize FastAPI app
@@ -29,43 +37,430 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Social platforms to filter
-SOCIAL_PLATFORMS = [
-    "youtube.com", "youtu.be", "instagram.com", 
-    "facebook.com", "fb.com", "m.facebook.com",
-    "twitter.com", "x.com", "reddit.com", "tiktok.com",
-    "pinterest.com", "linkedin.com", "snapchat.com",
-    "quora.com", "medium.com", "tumblr.com"
-]
-
-def is_social_platform(url):
-    if not url:
-        return True
-    return any(platform in url.lower() for platform in SOCIAL_PLATFORMS)
-
-def format_source_for_model(url):
-    if not url:
-        return "unknown"
-    domain = urlparse(url).netloc
-    if domain.startswith("www."):
-        domain = domain[4:]
-    return domain
-
-# Initialize agents
-print("Initializing agents...")
-claim_agent = ClaimExtractorAgent()
-retriever_agent = EvidenceRetrieverAgent()
-verifier_agent = CrossVerifierAgent()
-source_agent = SourceScorerAgent()
-aggregator_agent = AggregatorAgent()
-web_agent = WebRetrieverAgent()
-image_agent = ImageToTextAgent()
-print("Agents initialized successfully!")
+domain_policy = DomainPolicy.from_files()
+
+# Agents are built on first use (or by the startup warmup) so workers start serving immediately
+agents = AgentRegistry()
+agents.register("claim_extractor", "agents.claim_extractor:ClaimExtractorAgent")
+agents.register("evidence_retriever", "agents.evidence_retriever:EvidenceRetrieverAgent")
+agents.register("cross_verifier", "agents.cross_verifier:CrossVerifierAgent")
+agents.register("source_scorer", "agents.source_scorer:SourceScorerAgent")
+agents.register("aggregator", "agents.aggregator:AggregatorAgent")
+agents.register("web_retriever", "agents.web_retriever:WebRetrieverAgent")
+agents.register("image_to_text", "agents.image_to_text:ImageToTextAgent")
+agents.register("claim_index", "agents.claim_index:ClaimIndex")
+agents.register("evidence_ranker", "agents.evidence_ranker:EvidenceRanker")
+
+if VERIFIER_MODE == "cascade":
+    # Local NLI first, LLM only for low-confidence pairs
+    agents.register("cross_verifier", "agents.nli_verifier:CascadeVerifierAgent")
+
+if MODEL_SERVER_ADDRESS:
+    # Models live in the shared model server; this worker only holds thin proxies
+    def remote_evidence_retriever():
+        from agents.evidence_retriever import EvidenceRetrieverAgent
+        from agents.model_server import RemoteEmbeddings
+        return EvidenceRetrieverAgent(embeddings=RemoteEmbeddings())
+
+    def remote_claim_index():
+        from agents.claim_index import ClaimIndex
+        from agents.model_server import RemoteEmbeddings
+        return ClaimIndex(embeddings=RemoteEmbeddings())
+
+    agents.register("source_scorer", "agents.model_server:RemoteSourceScorer")
+    agents.register("evidence_retriever", remote_evidence_retriever)
+    def remote_evidence_ranker():
+        from agents.evidence_ranker import EvidenceRanker
+        from agents.model_server import RemoteEmbeddings
+        return EvidenceRanker(embeddings=RemoteEmbeddings())
+
+    def remote_claim_extractor():
+        from agents.claim_extractor import ClaimExtractorAgent
+        from agents.model_server import RemoteEmbeddings
+        return ClaimExtractorAgent(embeddings=RemoteEmbeddings())
+
+    agents.register("claim_index", remote_claim_index)
+    agents.register("evidence_ranker", remote_evidence_ranker)
+    agents.register("claim_extractor", remote_claim_extractor)
+
+result_cache = ResultCache()
+
+async def cache_io(func, *args):
+    """Call a result_cache method; the sqlite backend does blocking I/O, so that runs in the threadpool."""
+    if result_cache.backend == "sqlite":
+        return await run_in_threadpool(func, *args)
+    return func(*args)
+
+async def get_agent(name):
+    """Return an agent, constructing it off the event loop on first use."""
+    instance = agents.get_loaded(name)
+    if instance is None:
+        instance = await run_in_threadpool(agents.get, name)
+    return instance
+
+@app.on_event("startup")
+def warmup_agents():
+    if WARMUP_ON_STARTUP:
+        print(f"Warming up agents in background: {', '.join(WARMUP_COMPONENTS)}")
+        agents.warmup(WARMUP_COMPONENTS)
+
+@app.on_event("shutdown")
+async def close_clients():
+    await close_http_clients()
+
+@app.middleware("http")
+async def count_requests(request: Request, call_next):
+    response = await call_next(request)
+    if request.url.path.startswith("/verify"):
+        REQUESTS.inc(endpoint=request.url.path, status=response.status_code)
+    return response
+
+# Caps in-flight verifier calls across all requests served by this process
+verification_semaphore = asyncio.Semaphore(VERIFICATION_CONCURRENCY_PER_PROCESS)
+# Caps batch items running through the pipeline at once, shared by all /verify/batch requests
+batch_semaphore = asyncio.Semaphore(BATCH_CONCURRENCY_PER_PROCESS)
+# Strong references to fire-and-forget tasks (e.g. KB write-back) until they finish
+background_tasks = set()
+
+def run_in_background(func, *args):
+    async def runner():
+        try:
+            await run_in_threadpool(func, *args)
+        except Exception as e:
+            print(f"Background task {func.__name__} failed: {e}")
+    task = asyncio.ensure_future(runner())
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+async def retrieve_evidence(claim):
+    """Tiered retrieval: local knowledge base first, live web search when it has too few close hits."""
+    try:
+        retriever_agent = await get_agent("evidence_retriever")
+        with span("kb_search"):
+            kb_results = await run_in_threadpool(retriever_agent.search_with_scores, claim, 5, KB_SIMILARITY_THRESHOLD)
+    except Exception as e:
+        print(f"Knowledge base lookup failed: {e}")
+        UPSTREAM_ERRORS.inc(service="knowledge_base")
+        kb_results = []
+    if len(kb_results) >= KB_MIN_HITS:
+        return kb_results, 'knowledge_base'
+    web_agent = await get_agent("web_retriever")
+    with span("web_search"):
+        return await run_in_threadpool(web_agent.get_live_evidence, claim), 'web'
+
+# Fields of a verified claim result stored in (and restored from) the claim index
+CLAIM_INDEX_FIELDS = ('retrieval', 'sources', 'best', 'source_domain', 'support_score', 'cross_score')
+
+async def lookup_verified_claim(claim, include_explanation):
+    """Reuse the verdict of a recently verified near-duplicate claim, or None."""
+    try:
+        index = await get_agent("claim_index")
+        with span("claim_index"):
+            match = await run_in_threadpool(index.lookup, claim)
+    except Exception as e:
+        print(f"Claim index lookup failed: {e}")
+        UPSTREAM_ERRORS.inc(service="claim_index")
+        return None
+    if match is None or (include_explanation and any(source["explanation"] is None for source in match['result']['sources'])):
+        CACHE_REQUESTS.inc(cache="claim_index", result="miss")
+        return None
+    CACHE_REQUESTS.inc(cache="claim_index", result="hit")
+    
+    stored = match['result']
+    return dict(
+        stored,
+        claim=claim,
+        status='verified',
+        retrieval=dict(
+            stored['retrieval'], tier='claim_index',
+            matched_claim=match['claim'], similarity=round(match['similarity'], 4)
+        ),
+        sources=[
+            dict(source, explanation=source["explanation"] if include_explanation else None, cached=True)
+            for source in stored['sources']
+        ]
+    )
+
+async def notify(emit, event, data):
+    """Send a pipeline stage event to the optional emit(event, data) callback (used for SSE)."""
+    if emit is not None:
+        await emit(event, data)
+
+async def rank_sources(claim, sources):
+    """
+    Indices of the sources worth sending to the LLM verifier, plus every
+    source's similarity to the claim (None if ranking is off or failed).
+    """
+    if not EVIDENCE_RANKING_ENABLED or not sources:
+        return list(range(len(sources))), None
+    try:
+        ranker = await get_agent("evidence_ranker")
+        with span("evidence_ranking"):
+            if all("similarity" in result for result in sources):
+                # Knowledge-base hits already carry their similarity to the claim
+                similarities = [result["similarity"] for result in sources]
+            else:
+                snippets = [result.get("snippet", "") for result in sources]
+                similarities = (await run_in_threadpool(ranker.similarities, claim, snippets)).tolist()
+        return ranker.select(similarities), similarities
+    except Exception as e:
+        print(f"Evidence ranking failed, verifying every source: {e}")
+        return list(range(len(sources))), None
+
+async def verify_sources(claim, sources, include_explanation, request_semaphore, emit=None):
+    """
+    Verify the claim against every source, serving cached verdicts and preserving source order.
+    Sources the relevance stage prunes are marked unrelated without an LLM call.
+    """
+    entries = [None] * len(sources)
+    pending = []
+    selected, similarities = await rank_sources(claim, sources)
+    selected = set(selected)
+    cached_verdicts = await cache_io(lambda: [
+        result_cache.get_verdict(claim, result.get("snippet", ""), include_explanation) for result in sources
+    ])
+    for i, (result, cached) in enumerate(zip(sources, cached_verdicts)):
+        if cached is not None:
+            entries[i] = source_entry(result, cached, include_explanation, cached=True)
+        elif i not in selected:
+            pruned = {
+                'verdict': 'unrelated',
+                'explanation': f"Not sent for verification: similarity to the claim {similarities[i]:.2f} "
+                               "is below the relevance threshold or outside the top ranked snippets"
+            }
+            entries[i] = dict(
+                source_entry(result, pruned, include_explanation), similarity=round(similarities[i], 4), pruned=True
+            )
+            EVIDENCE_PRUNED.inc()
+        else:
+            pending.append(i)
+            continue
+        await notify(emit, "verdict", dict(entries[i], claim=claim, index=i))
+
+    async def record(position, verdict_result):
+        i = pending[position]
+        result = sources[i]
+        await cache_io(result_cache.set_verdict, claim, result.get("snippet", ""), verdict_result)
+        entries[i] = source_entry(result, verdict_result, include_explanation, cached=False)
+        await notify(emit, "verdict", dict(entries[i], claim=claim, index=i))
+
+    if pending:
+        await run_verifier(claim, [sources[i] for i in pending], include_explanation, request_semaphore, record)
+
+    return entries
+
+@contextmanager
+def count_llm_errors():
+    try:
+        yield
+    except Exception:
+        UPSTREAM_ERRORS.inc(service="llm")
+        raise
+
+async def run_verifier(claim, sources, include_explanation, request_semaphore, on_result):
+    """Verify the claim against every source concurrently; on_result(position, verdict) fires as each finishes."""
+    verifier_agent = await get_agent("cross_verifier")
+    if VERIFICATION_BATCH_MODE and hasattr(verifier_agent, 'averify_claim_batch'):
+        snippets = [result.get("snippet", "") for result in sources]
+        async with request_semaphore, verification_semaphore:
+            with span("verification"), count_llm_errors():
+                verdict_results = await verifier_agent.averify_claim_batch(claim, snippets, with_explanation=include_explanation)
+        for position, verdict_result in enumerate(verdict_results):
+            await on_result(position, verdict_result)
+        return
+
+    async def verify_one(position, result):
+        snippet = result.get("snippet", "")
+
+        async with request_semaphore, verification_semaphore:
+            with span("verification"), count_llm_errors():
+                if include_explanation and hasattr(verifier_agent, 'averify_claim_with_explanation'):
+                    verdict_result = await verifier_agent.averify_claim_with_explanation(claim, snippet)
+                else:
+                    verdict_result = await verifier_agent.averify_claim(claim, snippet)
+        await on_result(position, verdict_result)
+
+    # Results are written back by position, keeping best-evidence selection deterministic
+    await asyncio.gather(*(verify_one(position, result) for position, result in enumerate(sources)))
+
+def source_entry(result, verdict_result, include_explanation, cached=False):
+    if isinstance(verdict_result, dict):
+        verdict = verdict_result['verdict']
+        verdict_explanation = verdict_result['explanation']
+    else:
+        verdict = verdict_result
+        verdict_explanation = f"Verdict: {verdict}"
+
+    return {
+        "url": result.get("link", ""),
+        "snippet": result.get("snippet", ""),
+        "verdict": verdict,
+        "explanation": verdict_explanation if include_explanation else None,
+        "cached": cached
+    }
+
+def cross_verification_score(sources):
+    """1-5 agreement score from the share of informative sources that support the claim."""
+    supporting = sum(1 for source in sources if source["verdict"] == "support")
+    contradicting = sum(1 for source in sources if source["verdict"] == "contradict")
+    if supporting + contradicting == 0:
+        return None
+    return 1.0 + 4.0 * supporting / (supporting + contradicting)
+
+VERDICT_SCORES = {'support': 1, 'contradict': 0, 'unrelated': -1}
+
+def filter_sources(web_results):
+    """Drop blocked domains (social platforms by default) and keep at most 5 news sources."""
+    valid_sources = []
+    skipped_social = 0
+    trusted = 0
+    classes = domain_policy.classify_many([result.get("link", "") for result in web_results])
+    for result, domain_class in zip(web_results, classes):
+        if domain_class == BLOCKED:
+            skipped_social += 1
+            continue
+        valid_sources.append(result)
+        trusted += domain_class == TRUSTED
+        if len(valid_sources) >= 5:
+            break
+    return valid_sources, skipped_social, trusted
+
+def select_best_evidence(all_sources_data):
+    """Pick the first source with the highest verdict score (falls back to the first source)."""
+    best = {'score': -1, 'evidence': "", 'url': "", 'verdict': "", 'verdict_explanation': ""}
+    for source in all_sources_data:
+        verdict_score = VERDICT_SCORES.get(source["verdict"], -1)
+        if verdict_score > best['score']:
+            best = {
+                'score': verdict_score,
+                'evidence': source["snippet"],
+                'url': source["url"],
+                'verdict': source["verdict"],
+                'verdict_explanation': source["explanation"] or ""
+            }
+    
+    # Fallback
+    if not best['url'] and all_sources_data:
+        first = all_sources_data[0]
+        best.update(url=first["url"], evidence=first["snippet"], verdict="unrelated")
+    return best
+
+async def verify_claim(claim, include_explanation, request_semaphore, searches, emit=None):
+    """Retrieve, filter and verify one claim. Identical queries within a request share one retrieval."""
+    try:
+        if CLAIM_INDEX_ENABLED:
+            reused = await lookup_verified_claim(claim, include_explanation)
+            if reused is not None:
+                await notify(emit, "sources", {
+                    'claim': claim,
+                    'retrieval': reused['retrieval'],
+                    'sources': [{'url': source["url"], 'snippet': source["snippet"]} for source in reused['sources']]
+                })
+                # Same event sequence as a fresh verification
+                for i, source in enumerate(reused['sources']):
+                    await notify(emit, "verdict", dict(source, claim=claim, index=i))
+                return reused
+        
+        query = normalize_text(claim)
+        if query not in searches:
+            searches[query] = asyncio.ensure_future(retrieve_evidence(claim))
+        web_results, tier = await searches[query]
+        
+        valid_sources, skipped_social, trusted = filter_sources(web_results)
+        retrieval = {
+            'tier': tier,
+            'total_sources_found': len(web_results),
+            'social_platforms_filtered': skipped_social,
+            'valid_news_sources': len(valid_sources),
+            'trusted_sources': trusted
+        }
+        await notify(emit, "sources", {
+            'claim': claim,
+            'retrieval': retrieval,
+            'sources': [
+                {'url': result.get("link", ""), 'title': result.get("title", ""), 'snippet': result.get("snippet", "")}
+                for result in valid_sources
+            ]
+        })
+        if not valid_sources:
+            return {'claim': claim, 'status': 'no_sources', 'retrieval': retrieval}
+        
+        all_sources_data = await verify_sources(claim, valid_sources, include_explanation, request_semaphore, emit)
+        best = select_best_evidence(all_sources_data)
+        
+        # Relevant web evidence goes into the KB so recurring claims are answered locally
+        retriever_agent = agents.get_loaded("evidence_retriever")
+        if tier == 'web' and KB_WRITE_BACK and retriever_agent is not None:
+            relevant = [
+                result for result, source in zip(valid_sources, all_sources_data)
+                if source["verdict"] in ('support', 'contradict')
+            ]
+            if relevant:
+                run_in_background(retriever_agent.add_web_results, claim, relevant)
+        result = {
+            'claim': claim,
+            'status': 'verified',
+            'retrieval': retrieval,
+            'sources': all_sources_data,
+            'best': best,
+            'source_domain': source_name(best['url']),
+            'support_score': 4 if 'support' in best['verdict'] else 1,
+            'cross_score': cross_verification_score(all_sources_data)
+        }
+        
+        # Later paraphrases of this claim can reuse the verdict
+        claim_index = agents.get_loaded("claim_index")
+        if CLAIM_INDEX_ENABLED and claim_index is not None:
+            run_in_background(claim_index.add, claim, {field: result[field] for field in CLAIM_INDEX_FIELDS})
+        return result
+    except Exception as e:
+        print(f"Verification failed for claim '{claim}': {e}")
+        return {'claim': claim, 'status': 'error', 'error': str(e)}
+
+async def aggregate_claims(verified):
+    """Final 1-5 score for every verified claim, vectorized when aggregating locally."""
+    aggregator_agent = await get_agent("aggregator")
+    if getattr(aggregator_agent, 'mode', None) == 'local':
+        scores = aggregator_agent.aggregate_many(
+            [result['support_score'] for result in verified],
+            [result['source_score'] for result in verified],
+            [result['best']['verdict'] for result in verified],
+            [result['cross_score'] for result in verified]
+        )
+        return [float(score) for score in scores]
+    
+    return await asyncio.gather(*(
+        run_in_threadpool(
+            aggregator_agent.aggregate, result['support_score'], result['source_score'],
+            result['best']['verdict'], result['cross_score']
+        )
+        for result in verified
+    ))
+
+def public_claim_result(result):
+    if result['status'] != 'verified':
+        return {'claim': result['claim'], 'status': result['status'], 'error': result.get('error', 'No valid news sources found')}
+    return {
+        'claim': result['claim'],
+        'status': 'verified',
+        'verdict': result['best']['verdict'],
+        'best_evidence': result['best']['evidence'],
+        'best_url': result['best']['url'],
+        'source_domain': result['source_domain'],
+        'source_credibility_score': result['source_score'],
+        'final_credibility_score': result['final_score'],
+        'all_sources': result['sources']
+    }
 
 # Request/Response Models
 class TextVerificationRequest(BaseModel):
     text: str
     include_explanation: bool = True
+    include_timings: bool = False
+
+class BatchVerificationRequest(BaseModel):
+    texts: List[str]
+    include_explanation: bool = False
 
 class VerificationResponse(BaseModel):
     claims: List[str]
@@ -77,188 +472,313 @@ class VerificationResponse(BaseModel):
     final_credibility_score: float
     all_sources: List[dict]
     explanation: Optional[Dict[str, Any]] = None
+    cache: Optional[Dict[str, Any]] = None
+    claim_results: Optional[List[dict]] = None
+    article_score: Optional[float] = None
+    timings: Optional[Dict[str, Any]] = None
 
 @app.get("/")
 def health_check():
     return {"status": "ok", "message": "Fact Checking API with XAI is running"}
 
-@app.post("/verify/text", response_model=VerificationResponse)
-def verify_text(request: TextVerificationRequest):
-    try:
-        # Extract claims WITH explanation (with fallback)
-        if request.include_explanation and hasattr(claim_agent, 'extract_claims_with_explanation'):
-            claim_result = claim_agent.extract_claims_with_explanation(request.text)
-            if not claim_result['claims']:
-                raise HTTPException(status_code=400, detail="No claims extracted")
-            claims = claim_result['claims']
-            claim_explanation = {
-                'extraction': claim_result['explanation'],
-                'claims_analyzed': len(claims)
-            }
-        else:
-            claims = claim_agent.extract_claims(request.text)
-            if not claims:
-                raise HTTPException(status_code=400, detail="No claims extracted")
-            claim_explanation = {'extraction': f'Extracted {len(claims)} claim(s)', 'claims_analyzed': len(claims)}
-        
-        claim = claims[0]
-        web_results = web_agent.get_live_evidence(claim)
-        
-        # Filter valid sources
-        valid_sources = []
-        skipped_social = 0
-        for result in web_results:
-            url = result.get("link", "")
-            if is_social_platform(url):
-                skipped_social += 1
-                continue
-            valid_sources.append(result)
-            if len(valid_sources) >= 5:
-                break
-        
-        if not valid_sources:
-            raise HTTPException(status_code=404, detail="No valid news sources found")
-        
-        # Verify each source
-        verdict_map = {'support': 1, 'contradict': 0, 'unrelated': -1}
-        best_score = -1
-        best_evidence = ""
-        best_url = ""
-        best_verdict = ""
-        best_verdict_explanation = ""
-        all_sources_data = []
-        
-        for result in valid_sources:
-            snippet = result.get("snippet", "")
-            url = result.get("link", "")
-            
-            # Get verdict with explanation if available
-            if request.include_explanation and hasattr(verifier_agent, 'verify_claim_with_explanation'):
-                verdict_result = verifier_agent.verify_claim_with_explanation(claim, snippet)
-                verdict = verdict_result['verdict']
-                verdict_explanation = verdict_result['explanation']
-            else:
-                verdict_result = verifier_agent.verify_claim(claim, snippet)
-                if hasattr(verdict_result, "content"):
-                    verdict = verdict_result.content.strip().lower()
-                elif isinstance(verdict_result, dict) and "content" in verdict_result:
-                    verdict = verdict_result["content"].strip().lower()
+@app.get("/metrics")
+def metrics():
+    """Prometheus text exposition of stage latencies, cache/error counters and LLM token usage."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get("/ready")
+def readiness_check():
+    """Readiness: 200 once warmup components are loaded and none has failed, else 503."""
+    components = agents.status()
+    required = WARMUP_COMPONENTS if WARMUP_ON_STARTUP else []
+    ready = (
+        all(components[name]['state'] == READY for name in required)
+        and not any(status['state'] == ERROR for status in components.values())
+    )
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "components": components, "memory": memory_report(), "verifier": verifier_status()}
+    )
+
+def verifier_status():
+    verifier_agent = agents.get_loaded("cross_verifier")
+    status = {"mode": VERIFIER_MODE}
+    if verifier_agent is not None and hasattr(verifier_agent, 'escalation_rate'):
+        status.update(pairs=verifier_agent.pairs_total, escalation_rate=verifier_agent.escalation_rate())
+    return status
+
+async def run_text_pipeline(text, include_explanation, emit=None):
+    """
+    Full text verification pipeline; raises HTTPException for empty/unsupported input.
+    
+    emit, if given, is an async emit(event, data) callback receiving stage events:
+    claims, sources, verdict, source_score, aggregate.
+    """
+    claim_agent = await get_agent("claim_extractor")
+    
+    # Extract claims WITH explanation (with fallback), reusing cached extractions
+    claim_result = await cache_io(result_cache.get_claims, text, include_explanation)
+    claims_cached = claim_result is not None
+    if include_explanation and hasattr(claim_agent, 'extract_claims_with_explanation'):
+        if not claims_cached:
+            with span("claim_extraction"), count_llm_errors():
+                if hasattr(claim_agent, 'aextract_claims_with_explanation'):
+                    claim_result = await claim_agent.aextract_claims_with_explanation(text)
                 else:
-                    verdict = str(verdict_result).strip().lower()
-                verdict_explanation = f"Verdict: {verdict}"
-            
-            verdict_score = verdict_map.get(verdict, -1)
-            
-            all_sources_data.append({
-                "url": url,
-                "snippet": snippet,
-                "verdict": verdict,
-                "explanation": verdict_explanation if request.include_explanation else None
-            })
-            
-            if verdict_score > best_score:
-                best_score = verdict_score
-                best_evidence = snippet
-                best_url = url
-                best_verdict = verdict
-                if request.include_explanation:
-                    best_verdict_explanation = verdict_explanation
-        
-        # Fallback
-        if not best_url and valid_sources:
-            first = valid_sources[0]
-            best_url = first.get("link", "")
-            best_evidence = first.get("snippet", "")
-            best_verdict = "unrelated"
-        
-        # Score source WITH explanation (with fallback)
-        formatted_source = format_source_for_model(best_url)
-        if request.include_explanation and hasattr(source_agent, 'score_source_with_explanation'):
-            source_result = source_agent.score_source_with_explanation("Web", formatted_source)
-            source_score = source_result['score']
-            source_explanation = source_result
-        else:
-            source_score = source_agent.score_source("Web", formatted_source)
-            source_explanation = {
-                'score': source_score,
-                'explanation': f'Source credibility: {source_score}/5',
-                'contributing_factors': ['Domain reputation'],
-                'is_trusted': source_score >= 4.0
-            }
-        
-        # Calculate final score WITH explanation (with fallback)
-        support_score = 4 if 'support' in best_verdict else 1
-        
-        if request.include_explanation and hasattr(aggregator_agent, 'aggregate_with_explanation'):
-            aggregation_result = aggregator_agent.aggregate_with_explanation(
-                support_score, source_score, best_verdict
+                    claim_result = await run_in_threadpool(claim_agent.extract_claims_with_explanation, text)
+        if not claim_result['claims']:
+            raise HTTPException(status_code=400, detail="No claims extracted")
+        claims = claim_result['claims']
+        claim_explanation = {
+            'extraction': claim_result['explanation'],
+            'claims_analyzed': len(claims)
+        }
+    else:
+        if not claims_cached:
+            with span("claim_extraction"), count_llm_errors():
+                if hasattr(claim_agent, 'aextract_claims'):
+                    claims = await claim_agent.aextract_claims(text)
+                else:
+                    claims = await run_in_threadpool(claim_agent.extract_claims, text)
+                claim_result = {'claims': claims or []}
+        claims = claim_result['claims']
+        if not claims:
+            raise HTTPException(status_code=400, detail="No claims extracted")
+        claim_explanation = {'extraction': f'Extracted {len(claims)} claim(s)', 'claims_analyzed': len(claims)}
+    if not claims_cached:
+        await cache_io(result_cache.set_claims, text, claim_result)
+    await notify(emit, "claims", {'claims': claims, 'cached': claims_cached})
+    
+    # Verify every claim concurrently; the first verified claim drives the top-level fields
+    request_semaphore = asyncio.Semaphore(VERIFICATION_CONCURRENCY_PER_REQUEST)
+    searches = {}
+    results = await asyncio.gather(*(
+        verify_claim(claim, include_explanation, request_semaphore, searches, emit)
+        for claim in claims[:MAX_CLAIMS_PER_ARTICLE]
+    ))
+    verified = [result for result in results if result['status'] == 'verified']
+    
+    if not verified:
+        raise HTTPException(status_code=404, detail="No valid news sources found")
+    primary = verified[0]
+    best = primary['best']
+    
+    # Score every distinct best-evidence domain once across all claims
+    source_agent = await get_agent("source_scorer")
+    domains = list(dict.fromkeys(result['source_domain'] for result in verified))
+    with span("source_scoring"):
+        domain_scores = dict(zip(domains, await run_in_threadpool(source_agent.score_sources, domains)))
+    for result in verified:
+        result['source_score'] = domain_scores[result['source_domain']]
+    for domain, score in domain_scores.items():
+        await notify(emit, "source_score", {'domain': domain, 'score': score})
+    
+    # Score source WITH explanation (with fallback)
+    formatted_source = primary['source_domain']
+    source_score = primary['source_score']
+    if include_explanation and hasattr(source_agent, 'score_source_with_explanation'):
+        with span("source_explanation"):
+            source_explanation = await run_in_threadpool(
+                source_agent.score_source_with_explanation, "Web", formatted_source, source_score
             )
-            final_score = aggregation_result['final_score']
-            aggregation_explanation = aggregation_result
-        else:
-            final_score = aggregator_agent.aggregate(support_score, source_score, best_verdict)
-            aggregation_explanation = {
-                'final_score': final_score,
-                'explanation': f'Combined evidence ({support_score}/5) and source credibility ({source_score}/5)',
-                'breakdown': {
-                    'evidence_quality': {'score': support_score, 'verdict': best_verdict},
-                    'source_credibility': {'score': source_score}
-                }
+    else:
+        source_explanation = {
+            'score': source_score,
+            'explanation': f'Source credibility: {source_score}/5',
+            'contributing_factors': ['Domain reputation'],
+            'is_trusted': source_score >= 4.0
+        }
+    
+    # Calculate final scores WITH explanation (with fallback)
+    aggregator_agent = await get_agent("aggregator")
+    with span("aggregation"):
+        final_scores = await aggregate_claims(verified)
+    for result, final_score in zip(verified, final_scores):
+        result['final_score'] = final_score
+    
+    support_score = primary['support_score']
+    cross_score = primary['cross_score']
+    if include_explanation and hasattr(aggregator_agent, 'aggregate_with_explanation'):
+        with span("aggregation"):
+            aggregation_explanation = await run_in_threadpool(
+                aggregator_agent.aggregate_with_explanation, support_score, source_score, best['verdict'], cross_score
+            )
+        primary['final_score'] = aggregation_explanation['final_score']
+    else:
+        aggregation_explanation = {
+            'final_score': primary['final_score'],
+            'explanation': f'Combined evidence ({support_score}/5) and source credibility ({source_score}/5)',
+            'breakdown': {
+                'evidence_quality': {'score': support_score, 'verdict': best['verdict']},
+                'source_credibility': {'score': source_score},
+                'cross_verification': {'score': cross_score}
             }
-        
-        # Build explanation object
-        explanation = None
-        if request.include_explanation:
-            explanation = {
-                'claim_extraction': claim_explanation,
-                'evidence_retrieval': {
-                    'total_sources_found': len(web_results),
-                    'social_platforms_filtered': skipped_social,
-                    'valid_news_sources': len(valid_sources)
-                },
-                'best_evidence_selection': {
-                    'chosen_source': best_url,
-                    'reason': f"Highest verdict score ({best_score})",
-                    'verdict_explanation': best_verdict_explanation
-                },
-                'source_credibility': source_explanation,
-                'final_calculation': aggregation_explanation
+        }
+    article_score = sum(result['final_score'] for result in verified) / len(verified)
+    await notify(emit, "aggregate", {
+        'claim_scores': [{'claim': result['claim'], 'final_score': result['final_score']} for result in verified],
+        'article_score': article_score,
+        'final_calculation': aggregation_explanation
+    })
+    
+    # Build explanation object
+    explanation = None
+    if include_explanation:
+        explanation = {
+            'claim_extraction': claim_explanation,
+            'evidence_retrieval': primary['retrieval'],
+            'best_evidence_selection': {
+                'chosen_source': best['url'],
+                'reason': f"Highest verdict score ({best['score']})",
+                'verdict_explanation': best['verdict_explanation']
+            },
+            'source_credibility': source_explanation,
+            'final_calculation': aggregation_explanation,
+            'article': {
+                'claims_verified': len(verified),
+                'claims_unverified': len(results) - len(verified),
+                'search_queries': len(searches),
+                'domains_scored': len(domains),
+                'article_score': article_score
             }
-        
-        return VerificationResponse(
-            claims=claims,
-            best_evidence=best_evidence,
-            best_url=best_url,
-            source_domain=formatted_source,
-            source_credibility_score=source_score,
-            verdict=best_verdict,
-            final_credibility_score=final_score,
-            all_sources=all_sources_data,
-            explanation=explanation
-        )
+        }
+    
+    all_verified_sources = [source for result in verified for source in result['sources']]
+    # Pruned sources never reach the verifier, so they count as neither verdict hits nor misses
+    pruned_sources = [source for source in all_verified_sources if source.get("pruned")]
+    judged_sources = [source for source in all_verified_sources if not source.get("pruned")]
+    return VerificationResponse(
+        claims=claims,
+        best_evidence=best['evidence'],
+        best_url=best['url'],
+        source_domain=formatted_source,
+        source_credibility_score=source_score,
+        verdict=best['verdict'],
+        final_credibility_score=primary['final_score'],
+        all_sources=primary['sources'],
+        explanation=explanation,
+        cache={
+            'claims_hit': claims_cached,
+            'verdict_hits': sum(1 for source in judged_sources if source["cached"]),
+            'verdict_misses': sum(1 for source in judged_sources if not source["cached"]),
+            'pruned': len(pruned_sources)
+        },
+        claim_results=[public_claim_result(result) for result in results],
+        article_score=article_score
+    )
+
+@app.post("/verify/text", response_model=VerificationResponse)
+async def verify_text(request: TextVerificationRequest, response: Response):
+    """Stage timings are always sent as a Server-Timing header and, with include_timings, in the body."""
+    try:
+        with collect_timings() as timings:
+            with span("pipeline"):
+                result = await run_text_pipeline(request.text, request.include_explanation)
+        response.headers["Server-Timing"] = server_timing_header(timings)
+        if request.include_timings:
+            result.timings = timings
+        return result
     
     except Exception as e:
         import traceback
         print("Error details:", traceback.format_exc())
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/verify/text/stream")
+async def verify_text_stream(request: TextVerificationRequest):
+    """
+    Server-Sent Events variant of /verify/text.
+    
+    Emits claims, sources (per claim), verdict (per source), source_score
+    (per domain) and aggregate events as each stage finishes, then a final
+    result event carrying the VerificationResponse payload (or an error event).
+    """
+    queue = asyncio.Queue()
+
+    async def emit(event, data):
+        await queue.put((event, data))
+
+    async def run():
+        try:
+            result = await run_text_pipeline(request.text, request.include_explanation, emit)
+            await emit("result", result)
+        except HTTPException as e:
+            await emit("error", {"status_code": e.status_code, "detail": e.detail})
+        except Exception as e:
+            import traceback
+            print("Error details:", traceback.format_exc())
+            await emit("error", {"status_code": 500, "detail": str(e)})
+        finally:
+            await queue.put(None)
+
+    async def stream():
+        task = asyncio.ensure_future(run())
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                event, data = item
+                yield f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+        finally:
+            task.cancel()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/verify/batch")
+async def verify_batch(request: BatchVerificationRequest):
+    """
+    Verify many texts, streaming one NDJSON record per item as soon as it finishes.
+    
+    Records are {"index", "status": "ok", "result": VerificationResponse} or
+    {"index", "status": "error", "status_code", "error"}; one failed item never
+    aborts the batch. Records arrive in completion order, not input order.
+    """
+    if len(request.texts) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {BATCH_MAX_ITEMS} items")
+
+    async def run_item(index, text):
+        async with batch_semaphore:
+            try:
+                result = await run_text_pipeline(text, request.include_explanation)
+                return {"index": index, "status": "ok", "result": jsonable_encoder(result)}
+            except HTTPException as e:
+                return {"index": index, "status": "error", "status_code": e.status_code, "error": e.detail}
+            except Exception as e:
+                print(f"Batch item {index} failed: {e}")
+                return {"index": index, "status": "error", "status_code": 500, "error": str(e)}
+
+    async def stream():
+        tasks = [asyncio.ensure_future(run_item(i, text)) for i, text in enumerate(request.texts)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield json.dumps(await next_done) + "\n"
+        finally:
+            # Client went away (or we finished): don't keep verifying abandoned items
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
 @app.post("/verify/image", response_model=VerificationResponse)
-async def verify_image(file: UploadFile = File(...), include_explanation: bool = True):
+async def verify_image(response: Response, file: UploadFile = File(...), include_explanation: bool = True,
+                       include_timings: bool = False):
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as tmp_file:
+        with collect_timings():
             content = await file.read()
-            tmp_file.write(content)
-            tmp_file_path = tmp_file.name
-        
-        try:
-            text = image_agent.extract_text_from_file(tmp_file_path)
+            image_agent = await get_agent("image_to_text")
+            with span("ocr"):
+                text = await image_agent.aextract_text_from_bytes(content, file.filename or "image.png")
             if not text:
                 raise HTTPException(status_code=400, detail="No text extracted from image")
             
-            request = TextVerificationRequest(text=text, include_explanation=include_explanation)
-            return verify_text(request)
-        finally:
-            os.unlink(tmp_file_path)
+            request = TextVerificationRequest(text=text, include_explanation=include_explanation,
+                                              include_timings=include_timings)
+            return await verify_text(request, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
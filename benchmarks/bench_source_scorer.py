@@ -0,0 +1,89 @@
+"""
+Throughput/latency benchmark for DeBERTa source scoring.
+
+Compares one-at-a-time inference with padded batches of several sizes and
+with the micro-batcher under concurrent single-domain calls. The score
+cache is bypassed so every domain is a cold forward pass.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_source_scorer --domains 256 --batch-sizes 1 8 16 32 64
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from agents.micro_batcher import MicroBatcher
+from agents.source_scorer import SourceScorerAgent
+
+BASE_DOMAINS = [
+    "reuters.com", "apnews.com", "bbc.com", "nytimes.com", "theguardian.com",
+    "washingtonpost.com", "cnn.com", "foxnews.com", "aljazeera.com", "npr.org",
+    "bloomberg.com", "wsj.com", "nature.com", "nasa.gov", "who.int", "dailymail.co.uk"
+]
+
+def make_domains(count):
+    """Unique synthetic domains so nothing is served from the score cache."""
+    return [f"news{i}.{BASE_DOMAINS[i % len(BASE_DOMAINS)]}" for i in range(count)]
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+def bench_batch_size(agent, domains, batch_size):
+    latencies = []
+    start = time.perf_counter()
+    for i in range(0, len(domains), batch_size):
+        t0 = time.perf_counter()
+        agent._predict_batch(domains[i:i + batch_size])
+        latencies.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - start
+    return {
+        "mode": f"batch={batch_size}",
+        "domains_per_sec": len(domains) / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": percentile(latencies, 95),
+    }
+
+def bench_micro_batcher(agent, domains, concurrency, max_batch_size, max_wait_ms):
+    batcher = MicroBatcher(agent._predict_batch, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    latencies = []
+
+    def call(domain):
+        t0 = time.perf_counter()
+        batcher.submit(domain)
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(call, domains))
+    elapsed = time.perf_counter() - start
+    return {
+        "mode": f"micro-batch (threads={concurrency}, max={max_batch_size}, wait={max_wait_ms}ms)",
+        "domains_per_sec": len(domains) / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": percentile(latencies, 95),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--domains", type=int, default=256)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16, 32, 64])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--wait-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    agent = SourceScorerAgent()
+    domains = make_domains(args.domains)
+    agent._predict_batch(domains[:8])  # warm up kernels / allocator
+
+    rows = [bench_batch_size(agent, domains, size) for size in args.batch_sizes]
+    rows.append(bench_micro_batcher(agent, domains, args.concurrency, max(args.batch_sizes), args.wait_ms))
+
+    print(f"\n{'mode':<60} {'domains/s':>10} {'p50 ms':>9} {'p95 ms':>9}")
+    for row in rows:
+        print(f"{row['mode']:<60} {row['domains_per_sec']:>10.1f} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f}")
+
+if __name__ == "__main__":
+    main()
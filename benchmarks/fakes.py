@@ -0,0 +1,115 @@
+"""
+Deterministic offline stand-ins for the external services used by the pipeline.
+
+The fakes answer instantly (or after a fixed simulated latency) with outputs
+derived only from their input, so benchmark numbers measure our own code.
+"""
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+VERDICTS = ["support", "contradict", "unrelated"]
+
+def stable_choice(text, options):
+    digest = hashlib.md5(text.encode("utf-8")).digest()
+    return options[digest[0] % len(options)]
+
+class FakeMessage:
+    def __init__(self, content, prompt):
+        self.content = content
+        self.usage_metadata = {
+            'input_tokens': len(prompt.split()),
+            'output_tokens': len(content.split()),
+            'total_tokens': len(prompt.split()) + len(content.split())
+        }
+
+class FakeLLM:
+    """Recognizes the claim-extraction and verification prompts and answers them deterministically."""
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def _answer(self, prompt):
+        self.calls += 1
+        if "Extracted Claims" in prompt:
+            article = prompt.split("Article:\n", 1)[1].split("\n\nExtracted Claims", 1)[0]
+            sentences = [s.strip() for s in re.split(r"(?<=[.!?])\s+", article) if len(s.split()) >= 4]
+            return "\n".join(sentences) or "NONE"
+        claim = prompt.split("CLAIM: ", 1)[1].split("\n", 1)[0] if "CLAIM: " in prompt else ""
+        if "JSON array" in prompt:
+            snippets = re.findall(r"^\[(\d+)\] (.*)$", prompt, re.M)
+            return json.dumps([
+                {"index": int(i), "verdict": stable_choice(claim + text, VERDICTS), "explanation": "Deterministic fake verdict."}
+                for i, text in snippets
+            ])
+        evidence = prompt.split("EVIDENCE: ", 1)[1].split("\n", 1)[0] if "EVIDENCE: " in prompt else ""
+        verdict = stable_choice(claim + evidence, VERDICTS)
+        if "Explanation:" in prompt:
+            return f"Verdict: {verdict}\nExplanation: Deterministic fake verdict."
+        return verdict
+
+    def invoke(self, prompt):
+        if self.latency:
+            time.sleep(self.latency)
+        return FakeMessage(self._answer(prompt), prompt)
+
+    async def ainvoke(self, prompt):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return FakeMessage(self._answer(prompt), prompt)
+
+class FakeSerpAPI:
+    """Drop-in for SerpAPIWrapper.results(): a fixed mix of news and social results per query."""
+    DOMAINS = ["reuters.com", "apnews.com", "youtube.com", "bbc.co.uk", "nytimes.com", "x.com", "npr.org"]
+
+    def __init__(self, latency=0.0, per_query=7):
+        self.latency = latency
+        self.per_query = per_query
+        self.calls = 0
+
+    def results(self, query):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        slug = hashlib.md5(query.encode("utf-8")).hexdigest()[:8]
+        return {'organic_results': [
+            {
+                'link': f"https://www.{domain}/{slug}/{i}",
+                'title': f"{domain} report {i}",
+                'snippet': f"{domain.split('.')[0].upper()} reports that {query}",
+                'source': domain
+            }
+            for i, domain in enumerate((self.DOMAINS * self.per_query)[:self.per_query])
+        ]}
+
+class FakeOCRServer:
+    """Local HTTP server speaking the OCR.space response format, for exercising the real OCR client."""
+    def __init__(self, text="Fake OCR text.", latency=0.0):
+        text_, latency_ = text, latency
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if latency_:
+                    time.sleep(latency_)
+                body = json.dumps({'ParsedResults': [{'ParsedText': text_}], 'IsErroredOnProcessing': False}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/parse/image"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,297 @@
+"""
+Offline per-stage benchmark suite with regression thresholds.
+
+LLM, SerpAPI and OCR.space are replaced by the deterministic fakes in
+benchmarks/fakes.py; the DeBERTa reputation model, the embedding model and
+Chroma are the real local ones (Chroma runs on a throwaway directory).
+
+Usage (from the repository root):
+    python -m benchmarks.suite --output bench_results.json
+    python -m benchmarks.suite --write-baseline bench_baseline.json
+    python -m benchmarks.suite --baseline bench_baseline.json --tolerance 0.25
+    python -m benchmarks.suite --only claim_parsing aggregation
+
+Latencies are machine-specific, so no baseline is committed: record one with
+--write-baseline on the machine that will run the comparison. With --baseline
+the run exits non-zero if any benchmark's p50 or p95 latency is slower than
+the baseline by more than the tolerance. A baseline file may carry
+per-benchmark tolerances under "tolerances": {"verify_text": 0.5}.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.fakes import FakeLLM, FakeSerpAPI, FakeOCRServer
+
+TOPICS = [
+    "US military flew supersonic B-1 bombers close to Venezuela",
+    "The central bank raised interest rates by half a percentage point",
+    "A magnitude 6.1 earthquake struck off the coast of Japan",
+    "The city council approved a new budget for public transport",
+    "Scientists reported record low sea ice in the Arctic this summer",
+]
+
+BASE_DOMAINS = [
+    "reuters.com", "apnews.com", "bbc.com", "nytimes.com", "theguardian.com",
+    "washingtonpost.com", "cnn.com", "foxnews.com", "aljazeera.com", "npr.org"
+]
+
+def make_article(i):
+    """A unique three-claim article so nothing is served from the result/search caches."""
+    topic = TOPICS[i % len(TOPICS)]
+    return (
+        f"{topic} on day {i}. "
+        f"Officials confirmed the report number {i} to journalists. "
+        f"Independent observers published data set {i} supporting it."
+    )
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+def measure(func, iterations, warmup=1):
+    """Call func(i) for each iteration and summarize wall-clock latency."""
+    for i in range(warmup):
+        func(-1 - i)
+    latencies = []
+    start = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        func(i)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - start
+    return {
+        "iterations": iterations,
+        "mean_ms": statistics.fmean(latencies),
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": percentile(latencies, 95),
+        "ops_per_sec": iterations / elapsed,
+    }
+
+def with_fake_llm(cls, llm, **attributes):
+    """Build an LLM-backed agent around a fake client, skipping provider selection."""
+    agent = cls.__new__(cls)
+    agent.llm = llm
+    for name, value in attributes.items():
+        setattr(agent, name, value)
+    return agent
+
+def make_web_retriever(search):
+    from agents.web_retriever import WebRetrieverAgent
+    return WebRetrieverAgent(search=search)
+
+# ---------------------------------------------------------------- benchmarks
+
+def bench_claim_parsing(ctx):
+    from agents.claim_extractor import ClaimExtractorAgent
+    agent = with_fake_llm(ClaimExtractorAgent, FakeLLM(), embeddings=None)
+    return measure(lambda i: agent.extract_claims(make_article(i)), ctx.iterations * 10)
+
+def bench_verification_parsing(ctx):
+    from agents.cross_verifier import CrossVerifierAgent
+    agent = with_fake_llm(CrossVerifierAgent, FakeLLM())
+    evidences = [f"Snippet {j} about the event." for j in range(5)]
+    return measure(lambda i: agent.verify_claim_batch(TOPICS[i % len(TOPICS)], evidences, with_explanation=True),
+                   ctx.iterations * 10)
+
+def bench_scoring_single(ctx):
+    agent = ctx.source_scorer()
+    domains = [f"s{i}.{BASE_DOMAINS[i % len(BASE_DOMAINS)]}" for i in range(ctx.iterations)]
+    result = measure(lambda i: agent._predict_batch([domains[i]]), ctx.iterations)
+    result["domains_per_sec"] = result["ops_per_sec"]
+    return result
+
+def bench_scoring_batch(ctx):
+    from config import SOURCE_SCORE_BATCH_SIZE
+    agent = ctx.source_scorer()
+    batch = SOURCE_SCORE_BATCH_SIZE
+    iterations = max(1, ctx.iterations // 4)
+    result = measure(
+        lambda i: agent._predict_batch([f"b{i}x{j}.{BASE_DOMAINS[j % len(BASE_DOMAINS)]}" for j in range(batch)]),
+        iterations
+    )
+    result["batch_size"] = batch
+    result["domains_per_sec"] = result["ops_per_sec"] * batch
+    return result
+
+def bench_chroma_retrieval(ctx):
+    retriever = ctx.evidence_retriever()
+    search = FakeSerpAPI()
+    for topic in TOPICS:
+        retriever.add_web_results(topic, search.results(topic)['organic_results'])
+    return measure(lambda i: retriever.search_with_scores(TOPICS[i % len(TOPICS)], k=5), ctx.iterations)
+
+def bench_aggregation(ctx):
+    from agents.aggregator import AggregatorAgent
+    agent = AggregatorAgent(mode="local")
+    verdicts = ["support", "contradict", "unrelated"] * 10
+    support = [1.0 + (j % 5) for j in range(30)]
+    sources = [1.0 + ((j * 3) % 5) for j in range(30)]
+    single = measure(lambda i: agent.aggregate(3.0, 4.0, "support", 3.5), ctx.iterations * 100)
+    many = measure(lambda i: agent.aggregate_many(support, sources, verdicts), ctx.iterations * 100)
+    single["aggregate_many_30_p50_ms"] = many["p50_ms"]
+    return single
+
+def bench_ocr_client(ctx):
+    import httpx
+    from agents.image_to_text import ImageToTextAgent
+    server = FakeOCRServer(text=make_article(0))
+    # A client of its own: the shared one belongs to the process, not this benchmark's event loop
+    client = httpx.AsyncClient()
+    agent = ImageToTextAgent(api_url=server.url, hedge_after=None, http_client=client)
+    agent.use_tesseract = False
+    loop = asyncio.new_event_loop()
+    try:
+        return measure(lambda i: loop.run_until_complete(agent.aextract_text_from_bytes(b"\x89PNG fake", "bench.png")),
+                       ctx.iterations)
+    finally:
+        loop.run_until_complete(client.aclose())
+        loop.close()
+        server.close()
+
+def bench_verify_text(ctx):
+    import api
+    from fastapi import Response
+    from agents.claim_extractor import ClaimExtractorAgent
+    from agents.cross_verifier import CrossVerifierAgent
+    from agents.evidence_retriever import EvidenceRetrieverAgent
+    api.agents.override("claim_extractor", with_fake_llm(ClaimExtractorAgent, FakeLLM(), embeddings=None))
+    api.agents.override("cross_verifier", with_fake_llm(CrossVerifierAgent, FakeLLM()))
+    api.agents.override("web_retriever", make_web_retriever(FakeSerpAPI()))
+    # An empty knowledge base of its own (chroma_retrieval fills the shared one) and
+    # no write-back, so every claim takes the SerpAPI + verification path whatever ran before
+    kb_dir = os.path.join(ctx.kb_dir, "verify_text")
+    api.agents.override("evidence_retriever", EvidenceRetrieverAgent(persist_directory=kb_dir))
+    api.agents.override("source_scorer", ctx.source_scorer())
+    # Time the full path: similar make_article() claims would otherwise be served from
+    # the claim index, and it must never write fake verdicts to the real KB_PERSIST_DIR
+    from agents.claim_index import ClaimIndex
+    api.agents.override("claim_index", ClaimIndex(persist_directory=ctx.kb_dir))
+    claim_index_enabled, kb_write_back = api.CLAIM_INDEX_ENABLED, api.KB_WRITE_BACK
+    api.CLAIM_INDEX_ENABLED = api.KB_WRITE_BACK = False
+    loop = asyncio.new_event_loop()
+    try:
+        def run(i):
+            request = api.TextVerificationRequest(text=make_article(i), include_explanation=False)
+            loop.run_until_complete(api.verify_text(request, Response()))
+        return measure(run, ctx.iterations)
+    finally:
+        api.CLAIM_INDEX_ENABLED, api.KB_WRITE_BACK = claim_index_enabled, kb_write_back
+        if api.background_tasks:
+            loop.run_until_complete(asyncio.gather(*api.background_tasks))
+        loop.close()
+
+BENCHMARKS = {
+    "claim_parsing": bench_claim_parsing,
+    "verification_parsing": bench_verification_parsing,
+    "scoring_single": bench_scoring_single,
+    "scoring_batch": bench_scoring_batch,
+    "chroma_retrieval": bench_chroma_retrieval,
+    "aggregation": bench_aggregation,
+    "ocr_client": bench_ocr_client,
+    "verify_text": bench_verify_text,
+}
+
+class Context:
+    """Shares expensive local models between benchmarks; builds them on first use."""
+    def __init__(self, iterations):
+        self.iterations = iterations
+        self.kb_dir = tempfile.mkdtemp(prefix="bench_kb_")
+        self._source_scorer = None
+        self._evidence_retriever = None
+
+    def source_scorer(self):
+        if self._source_scorer is None:
+            from agents.source_scorer import SourceScorerAgent
+            self._source_scorer = SourceScorerAgent()
+            self._source_scorer._predict_batch(["warmup.example.com"])
+        return self._source_scorer
+
+    def evidence_retriever(self):
+        if self._evidence_retriever is None:
+            from agents.evidence_retriever import EvidenceRetrieverAgent
+            self._evidence_retriever = EvidenceRetrieverAgent(persist_directory=self.kb_dir)
+        return self._evidence_retriever
+
+    def close(self):
+        shutil.rmtree(self.kb_dir, ignore_errors=True)
+
+# ---------------------------------------------------------------- baseline
+
+def compare(results, baseline, tolerance):
+    """List of human-readable regressions (empty if none)."""
+    regressions = []
+    tolerances = baseline.get("tolerances", {})
+    for name, current in results["benchmarks"].items():
+        reference = baseline.get("benchmarks", {}).get(name)
+        if not reference:
+            continue
+        allowed = tolerances.get(name, tolerance)
+        for metric in ("p50_ms", "p95_ms"):
+            if metric in reference and current[metric] > reference[metric] * (1 + allowed):
+                regressions.append(
+                    f"{name}.{metric}: {current[metric]:.3f} ms vs baseline {reference[metric]:.3f} ms "
+                    f"(+{(current[metric] / reference[metric] - 1) * 100:.0f}%, allowed +{allowed * 100:.0f}%)"
+                )
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="run a subset of benchmarks")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--write-baseline", metavar="PATH", help="write these results as the new baseline")
+    args = parser.parse_args()
+
+    names = args.only or list(BENCHMARKS)
+    ctx = Context(args.iterations)
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "iterations": args.iterations,
+        },
+        "benchmarks": {},
+    }
+    try:
+        for name in names:
+            print(f"Running {name}...")
+            results["benchmarks"][name] = BENCHMARKS[name](ctx)
+    finally:
+        ctx.close()
+
+    print(f"\n{'benchmark':<24} {'iters':>7} {'p50 ms':>10} {'p95 ms':>10} {'ops/s':>10}")
+    for name, row in results["benchmarks"].items():
+        print(f"{name:<24} {row['iterations']:>7} {row['p50_ms']:>10.3f} {row['p95_ms']:>10.3f} {row['ops_per_sec']:>10.1f}")
+
+    for path in (args.output, args.write_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2)
+            print(f"Wrote {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("\nPERFORMANCE REGRESSIONS:")
+            for line in regressions:
+                print(f"  ✗ {line}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,19 @@ import os
 
 # Model paths
 REPUTATION_MODEL_PATH = "./models/deberta_reputation_model_export"
+# Inference backend: "torch" (float32), "torch-int8" (dynamic quantization) or "onnx"
+REPUTATION_BACKEND = "torch"
+REPUTATION_ONNX_PATH = "./models/deberta_reputation_model.onnx"
+REPUTATION_REFERENCE_DOMAINS = "./models/reference_domains.txt"
 
 # Knowledge base settings
 KB_PERSIST_DIR = "./knowledge_base/chroma_db"
 EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+# Tiered retrieval: answer from the KB when at least KB_MIN_HITS docs reach
+# KB_SIMILARITY_THRESHOLD, otherwise search the web and write good results back
+KB_SIMILARITY_THRESHOLD = 0.75
+KB_MIN_HITS = 3
+KB_WRITE_BACK = True
 
 # LLM settings - LOCAL MODELS ONLY (no API keys needed)
 DEFAULT_LLM_MODEL = "google/flan-t5-base"  # Free, runs locally
@@ -19,3 +28,100 @@ AGGREGATION_WEIGHTS = {
     "source_credibility": 0.4,
     "cross_verification": 0.2
 }
+# "local" combines scores with AGGREGATION_WEIGHTS; "llm" asks OpenRouter (opt-in)
+AGGREGATION_MODE = "local"
+
+# Long-document claim extraction: longer texts are split into overlapping sentence chunks
+CLAIM_CHUNK_THRESHOLD_CHARS = 6000
+CLAIM_CHUNK_CHARS = 4000
+CLAIM_CHUNK_OVERLAP_SENTENCES = 2
+CLAIM_CHUNK_CONCURRENCY = 4
+CLAIM_DEDUP_SIMILARITY = 0.9  # cosine similarity above which two claims are merged
+
+# Verification concurrency (per /verify request and across the whole process)
+VERIFICATION_CONCURRENCY_PER_REQUEST = 5
+VERIFICATION_CONCURRENCY_PER_PROCESS = 32
+# /verify/batch: max texts per request and texts in the pipeline at once across all batches
+BATCH_MAX_ITEMS = 1000
+BATCH_CONCURRENCY_PER_PROCESS = 8
+# Judge all snippets for a claim in one LLM call (falls back to per-snippet calls)
+VERIFICATION_BATCH_MODE = True
+
+# Source credibility score cache (in-process LRU + persistent SQLite)
+SOURCE_SCORE_CACHE_PATH = "./knowledge_base/source_scores.sqlite3"
+SOURCE_SCORE_CACHE_SIZE = 10000
+
+# Source scoring micro-batching (cold domains from concurrent requests share one forward pass)
+SOURCE_SCORE_MICRO_BATCHING = True
+SOURCE_SCORE_BATCH_SIZE = 32
+SOURCE_SCORE_BATCH_WAIT_MS = 5
+
+# Pipeline result cache: "memory" or "sqlite"
+RESULT_CACHE_BACKEND = "memory"
+RESULT_CACHE_PATH = "./knowledge_base/result_cache.sqlite3"
+CLAIM_CACHE_TTL = 24 * 3600  # seconds
+CLAIM_CACHE_SIZE = 10000
+VERDICT_CACHE_TTL = 6 * 3600  # seconds
+VERDICT_CACHE_SIZE = 50000
+
+# Web search result cache (fresh for SEARCH_CACHE_TTL, then served stale while refreshing)
+SEARCH_CACHE_TTL = 15 * 60  # seconds
+SEARCH_CACHE_STALE_TTL = 60 * 60  # seconds, 0 disables stale-while-revalidate
+SEARCH_CACHE_SIZE = 5000
+
+# Startup: agents are built lazily on first use; warmup loads these in parallel in the background
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "1") == "1"
+WARMUP_COMPONENTS = ["source_scorer", "evidence_retriever", "claim_index", "claim_extractor", "cross_verifier", "web_retriever"]
+
+# Shared model server (python -m agents.model_server). When MODEL_SERVER_ADDRESS is set,
+# API workers use it for source scoring and embeddings instead of loading the models
+MODEL_SERVER_ADDRESS = os.getenv("MODEL_SERVER_ADDRESS")  # Unix socket path or host:port
+MODEL_SERVER_AUTHKEY = os.getenv("MODEL_SERVER_AUTHKEY")  # required, shared by server and API workers
+MODEL_SERVER_WORKERS = int(os.getenv("MODEL_SERVER_WORKERS", "1"))
+
+# OCR: Tesseract input is downscaled to OCR_TARGET_DPI (or OCR_MAX_DIMENSION px when DPI is unknown)
+OCR_TARGET_DPI = 300
+OCR_MAX_DIMENSION = 2500
+OCR_TESSERACT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+# OCR.space client (point OCR_SPACE_API_URL at a local fake for testing)
+OCR_SPACE_API_URL = os.getenv("OCR_SPACE_API_URL", "https://api.ocr.space/parse/image")
+OCR_SPACE_TIMEOUT = 30
+OCR_SPACE_MAX_RETRIES = 3
+OCR_SPACE_BACKOFF_SECONDS = 0.5  # doubled after each failed attempt
+OCR_HEDGE_AFTER_SECONDS = 4.0  # start Tesseract alongside a slow OCR.space call; None disables
+OCR_MAX_CONNECTIONS = 10
+
+# Domain policy: optional list files (one domain per line) on top of the built-in social platform deny list
+DOMAIN_DENY_LIST_PATH = os.getenv("DOMAIN_DENY_LIST_PATH")
+DOMAIN_ALLOW_LIST_PATH = os.getenv("DOMAIN_ALLOW_LIST_PATH")
+DOMAIN_TRUSTED_LIST_PATH = os.getenv("DOMAIN_TRUSTED_LIST_PATH")
+DOMAIN_CACHE_SIZE = 65536
+
+# Semantic claim index: paraphrases of a recently verified claim reuse its verdict and evidence
+CLAIM_INDEX_ENABLED = True
+CLAIM_INDEX_COLLECTION = "verified_claims"
+CLAIM_INDEX_SIMILARITY = 0.9  # cosine similarity needed to reuse a stored verdict
+CLAIM_INDEX_MAX_AGE = 24 * 3600  # seconds a stored verdict stays reusable
+CLAIM_INDEX_PRUNE_INTERVAL = 3600  # seconds between deletions of expired entries (done on write)
+
+# Evidence pre-ranking: only the EVIDENCE_TOP_K snippets with cosine similarity >= EVIDENCE_MIN_SIMILARITY
+# to the claim go to the LLM verifier; the rest are marked unrelated
+EVIDENCE_RANKING_ENABLED = True
+EVIDENCE_TOP_K = 3
+EVIDENCE_MIN_SIMILARITY = 0.3
+
+# Verifier: "llm" sends every pair to the LLM; "cascade" answers confident pairs with a local NLI
+# model and escalates only pairs below NLI_CONFIDENCE_THRESHOLD (see agents/nli_verifier.py)
+VERIFIER_MODE = os.getenv("VERIFIER_MODE", "llm")
+NLI_MODEL = "cross-encoder/nli-deberta-v3-xsmall"
+NLI_CONFIDENCE_THRESHOLD = 0.8
+NLI_BATCH_SIZE = 32
+NLI_ESCALATION_TIMEOUT = 10.0  # seconds before falling back to the local verdicts
+
+# LIME explanations (agents/xai_explainer.py)
+LIME_NUM_SAMPLES = 300  # perturbed samples per explanation (LIME's own default is 5000)
+LIME_BATCH_SIZE = 32  # perturbed samples per model forward pass
+XAI_CACHE_SIZE = 1024
+XAI_INCLUDE_HTML = False
+SOURCE_LIME_EXPLANATIONS = False  # explain source scores with LIME in /verify responses